@@ -0,0 +1,202 @@
+"""Benchmark the Three.js exporter on synthetic scenes without Blender.
+
+plugin.py is imported against the stand-in bpy/mathutils in fake_bpy/, so it runs on a plain
+Linux box. The glTF exporter is stubbed; what is measured is everything around it: codegen,
+name sanitizing, cache hashing and file writes.
+
+    python benchmarks/bench_export.py --sizes 10 1000 --output bench.json
+    python benchmarks/bench_export.py --set threejs_scene_format=MANIFEST --set threejs_use_instancing=1
+
+Results are printed (or written with --output) as JSON so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "fake_bpy"))
+sys.path.insert(0, os.path.join(HERE, "..", "three-blender"))
+
+import bpy  # noqa: E402  (the stand-in from fake_bpy/)
+import plugin  # noqa: E402
+from butils import SymbolTable  # noqa: E402
+
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+LIGHT_TYPES = ("POINT", "SPOT", "AREA")
+# Awkward names on purpose: accents, spaces, dots and hyphens all go through safe_name
+NAME_STEMS = ("Chair", "Chaise é", "Tree.Oak", "Bolt-M8", "Größe Tür")
+
+
+def build_scene(object_count, shared_every=10, materials=False):
+    """Fill bpy.data with one camera, one light per 100 objects and meshes for the rest.
+
+    Every `shared_every`-th mesh reuses the previous datablock, like linked duplicates.
+    With `materials`, every mesh gets one shared node material, which lightmap baking needs.
+    """
+    bpy.data.clear()
+    scene = bpy.context.scene = bpy.types.Scene()
+
+    camera = bpy.Camera("Camera")
+    bpy.data.cameras.append(camera)
+    bpy.data.objects.append(bpy.Object("Camera", "CAMERA", camera, (0, -10, 2)))
+
+    light_count = max(1, object_count // 100)
+    for index in range(light_count):
+        light = bpy.Light(f"Light.{index:05d}", LIGHT_TYPES[index % len(LIGHT_TYPES)])
+        bpy.data.lights.append(light)
+        bpy.data.objects.append(bpy.Object(light.name, "LIGHT", light, (index, index, 5)))
+
+    material = bpy.data.materials.new("Material") if materials else None
+    mesh = None
+    for index in range(max(0, object_count - light_count - 1)):
+        if mesh is None or index % shared_every:
+            mesh = bpy.Mesh(f"Mesh.{index:06d}")
+            bpy.data.meshes.append(mesh)
+        name = f"{NAME_STEMS[index % len(NAME_STEMS)]}.{index:06d}"
+        location = (index % 100, (index // 100) % 100, index // 10000)
+        obj = bpy.Object(name, "MESH", mesh, location)
+        if material:
+            obj.material_slots.append(types.SimpleNamespace(material=material))
+        bpy.data.objects.append(obj)
+    return scene
+
+
+def apply_settings(scene, settings):
+    for key, value in settings.items():
+        setattr(scene, key, value)
+
+
+def time_safe_name(repeat):
+    # A fresh table each time, so every name is sanitized and deduplicated rather than served from
+    # the memo an export leaves behind
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        SymbolTable(bpy.data.objects, reserved=plugin.SCRIPT_GLOBALS)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_export(operator, html_path, export_dir):
+    bpy.ops.reset()
+    start = time.perf_counter()
+    operator.export_threejs(html_path, export_dir)
+    return time.perf_counter() - start
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def bench_size(object_count, settings, repeat, write_assets):
+    build_scene(object_count, materials=settings.get("threejs_bake_lightmaps", False))
+    apply_settings(bpy.context.scene, settings)
+    bpy.ops.write_assets = write_assets
+    operator = plugin.THREEJS_OT_export_scene()
+
+    out_dir = tempfile.mkdtemp(prefix="threejs_bench_")
+    try:
+        html_path = os.path.join(out_dir, "index.html")
+        export_dir = os.path.join(out_dir, "exported_gltfs")
+        os.makedirs(export_dir)
+
+        timings = []
+        for _ in range(repeat):
+            # A fresh output directory each time, so the export cache never hits
+            shutil.rmtree(export_dir)
+            os.makedirs(export_dir)
+            for leftover in (plugin.CACHE_MANIFEST, plugin.SCENE_MANIFEST):
+                if os.path.exists(os.path.join(out_dir, leftover)):
+                    os.remove(os.path.join(out_dir, leftover))
+            timings.append(run_export(operator, html_path, export_dir))
+        exporter_calls = bpy.ops.exporter_calls
+        bake_calls = bpy.ops.bake_calls
+        exporter_seconds = bpy.ops.exporter_seconds
+        phases = {name: round(seconds, 4) for name, seconds in operator.profile.phases.items()}
+
+        # Peak memory is measured on a separate run, as tracemalloc slows everything down
+        tracemalloc.start()
+        run_export(operator, html_path, export_dir)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        return {
+            "objects": object_count,
+            "meshes": sum(1 for obj in bpy.data.objects if obj.type == "MESH"),
+            "export_threejs_seconds": {"min": timings[0], "median": timings[len(timings) // 2]},
+            "phase_seconds": phases,
+            "stub_exporter_calls": exporter_calls,
+            "stub_bake_calls": bake_calls,
+            "stub_exporter_seconds": exporter_seconds,
+            "safe_name_seconds": time_safe_name(repeat),
+            "script_js_bytes": file_size(os.path.join(out_dir, "script.js")),
+            "scene_json_bytes": file_size(os.path.join(out_dir, plugin.SCENE_MANIFEST)),
+            "cache_manifest_bytes": file_size(os.path.join(out_dir, plugin.CACHE_MANIFEST)),
+            "peak_memory_bytes": peak_memory,
+        }
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def parse_setting(text):
+    key, _, value = text.partition("=")
+    if not key.startswith("threejs_") or not _:
+        raise argparse.ArgumentTypeError(f"expected threejs_<property>=<value>, got '{text}'")
+    for convert in (int, float):
+        try:
+            return key, convert(value)
+        except ValueError:
+            pass
+    if value.lower() in ("true", "false"):
+        return key, value.lower() == "true"
+    return key, value
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="object counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per size (min and median are reported)")
+    parser.add_argument("--set", type=parse_setting, action="append", default=[], metavar="PROP=VALUE",
+                        help="override a Scene property, e.g. threejs_scene_format=MANIFEST")
+    parser.add_argument("--write-assets", action="store_true", help="make the stub exporter write placeholder files")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    plugin.register()
+    settings = dict(args.set)
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "runs": [bench_size(size, settings, args.repeat, args.write_assets) for size in args.sizes],
+    }
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Stand-in for Blender's bmesh: merging only concatenates the source meshes' faces."""
+from bpy import _Item
+
+
+class BMesh:
+    def __init__(self):
+        self.vertices = []
+        self.polygons = []
+
+    def from_mesh(self, mesh):
+        self.vertices += [_Item(co=vertex.co) for vertex in mesh.vertices]
+        self.polygons += [_Item(loop_total=p.loop_total, material_index=p.material_index, use_smooth=p.use_smooth)
+                          for p in mesh.polygons]
+
+    def to_mesh(self, mesh):
+        mesh.set_geometry(self.vertices, self.polygons)
+
+    def free(self):
+        self.vertices = self.polygons = None
+
+
+def new():
+    return BMesh()
@@ -0,0 +1,403 @@
+"""A lightweight stand-in for Blender's bpy, so plugin.py can be benchmarked on a plain Python.
+
+It models only what the exporter touches: ID collections, objects with small meshes, cameras,
+lights, materials and images, a scene holding the add-on's properties, and a stubbed glTF
+exporter and lightmap baker that count calls.
+"""
+import copy
+import os
+import sys
+import time
+import types as _types
+from array import array
+
+from mathutils import Matrix, Vector
+
+# Property constructors return their default, so after plugin.register() the Scene class
+# carries every threejs_* default as a plain class attribute
+props = _types.ModuleType("bpy.props")
+
+
+def _property(fallback):
+    def constructor(**kwargs):
+        if "default" in kwargs:
+            return kwargs["default"]
+        if "items" in kwargs:
+            return kwargs["items"][0][0]
+        return fallback
+    return constructor
+
+
+props.StringProperty = _property("")
+props.BoolProperty = _property(False)
+props.IntProperty = _property(0)
+props.FloatProperty = _property(0.0)
+props.EnumProperty = _property("")
+
+
+class Panel:
+    pass
+
+
+class Operator:
+    def report(self, level, message):
+        print(f"{next(iter(level))}: {message}")
+
+
+class Scene:
+    def __init__(self):
+        self.world = None
+        self.collection = _types.SimpleNamespace(objects=_types.SimpleNamespace(link=lambda obj: None))
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_step = 1
+        self.frame_current = 1
+        self.render = _types.SimpleNamespace(fps=24, fps_base=1.0, engine='BLENDER_EEVEE')
+        self.cycles = _types.SimpleNamespace(device='GPU', samples=128)
+
+    def frame_set(self, frame):
+        self.frame_current = frame
+
+
+types = _types.ModuleType("bpy.types")
+types.Panel = Panel
+types.Operator = Operator
+types.Scene = Scene
+
+sys.modules["bpy.props"] = props
+sys.modules["bpy.types"] = types
+
+
+class Collection(list):
+    """bpy_prop_collection: iterable, indexable by position or name, with foreach_get."""
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._by_name = {item.name: item for item in self if hasattr(item, "name")}
+
+    def append(self, item):
+        super().append(item)
+        if hasattr(item, "name"):
+            self._by_name[item.name] = item
+
+    def clear(self):
+        super().clear()
+        self._by_name.clear()
+
+    def get(self, name, default=None):
+        return self._by_name.get(name, default)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._by_name[key]
+        return super().__getitem__(key)
+
+    def foreach_get(self, attr, seq):
+        index = 0
+        for item in self:
+            value = getattr(item, attr)
+            for component in (value if isinstance(value, (tuple, list)) else (value,)):
+                seq[index] = component
+                index += 1
+
+
+class _Item:
+    __slots__ = ("co", "vertex_index", "vertices", "loop_total", "material_index", "use_smooth", "uv")
+
+    def __init__(self, **values):
+        for key, value in values.items():
+            setattr(self, key, value)
+
+
+class UVLayers(Collection):
+    """Mesh.uv_layers: new layers get one UV per loop of their mesh."""
+
+    def __init__(self, mesh):
+        super().__init__()
+        self.mesh = mesh
+        self.active = None
+
+    def new(self, name):
+        layer = _types.SimpleNamespace(name=name, data=Collection(_Item(uv=(0.0, 0.0)) for _ in self.mesh.loops))
+        self.append(layer)
+        return layer
+
+    def remove(self, layer):
+        super().remove(layer)
+        self._by_name.pop(layer.name, None)
+        if self.active is layer:
+            self.active = None
+
+
+class Mesh:
+    """A quad split into two triangles, enough for hashing and triangle counts."""
+
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.vertices = Collection(_Item(co=co) for co in ((0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)))
+        self.loops = Collection(_Item(vertex_index=index) for index in (0, 1, 2, 0, 2, 3))
+        self.polygons = Collection(_Item(loop_total=3, material_index=0, use_smooth=False) for _ in range(2))
+        self.uv_layers = UVLayers(self)
+        self.materials = []
+
+    def set_geometry(self, vertices, polygons):
+        self.vertices = Collection(vertices)
+        self.polygons = Collection(polygons)
+        self.loops = Collection(_Item(vertex_index=0) for polygon in polygons for _ in range(polygon.loop_total))
+
+    def calc_loop_triangles(self):
+        # Fan triangulation over the loops, which is what Blender does for convex polygons
+        triangles = []
+        start = 0
+        for polygon in self.polygons:
+            loops = [self.loops[start + index].vertex_index for index in range(polygon.loop_total)]
+            for index in range(1, polygon.loop_total - 1):
+                triangles.append(_Item(vertices=(loops[0], loops[index], loops[index + 1]),
+                                       material_index=polygon.material_index))
+            start += polygon.loop_total
+        self.loop_triangles = Collection(triangles)
+
+    def transform(self, matrix):
+        for vertex in self.vertices:
+            vertex.co = tuple(matrix @ Vector(vertex.co))
+
+
+class _RNA:
+    def __init__(self, *identifiers):
+        self.properties = [
+            _types.SimpleNamespace(identifier=identifier, type='FLOAT', is_array=False) for identifier in identifiers
+        ]
+
+
+class Nodes(Collection):
+    """A node tree's nodes: enough for adding and removing a bake target."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = None
+
+    def new(self, type):
+        node = _types.SimpleNamespace(name=f"{type}.{len(self):03d}", type=type, image=None, inputs=[], bl_rna=_RNA())
+        self.append(node)
+        return node
+
+    def remove(self, node):
+        super().remove(node)
+        self._by_name.pop(node.name, None)
+
+
+class Material:
+    bl_rna = _RNA("roughness")
+
+    def __init__(self, name):
+        self.name = name
+        self.roughness = 0.5
+        self.use_nodes = True
+        self.node_tree = _types.SimpleNamespace(nodes=Nodes(), links=[])
+
+
+class Pixels:
+    """Image.pixels as a flat float buffer with foreach_get/foreach_set."""
+
+    def __init__(self, count):
+        self.values = array("f", bytes(4 * count))
+
+    def __len__(self):
+        return len(self.values)
+
+    def foreach_get(self, seq):
+        seq[:] = self.values
+
+    def foreach_set(self, seq):
+        self.values = array("f", seq)
+
+
+class Image:
+    def __init__(self, name, width, height, float_buffer=False):
+        self.name = name
+        self.size = (width, height)
+        self.pixels = Pixels(width * height * 4)
+        self.colorspace_settings = _types.SimpleNamespace(name='sRGB')
+        self.filepath_raw = ""
+        self.file_format = 'PNG'
+
+    def save(self):
+        with open(self.filepath_raw, "wb") as file:
+            file.write(b"\x89PNG")
+
+
+class Modifier:
+    bl_rna = _RNA("ratio")
+
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.ratio = 1.0
+
+
+class Modifiers(list):
+    def new(self, name, type):
+        modifier = Modifier(name, type)
+        self.append(modifier)
+        return modifier
+
+
+class Object:
+    def __init__(self, name, type, data=None, location=(0, 0, 0)):
+        self.name = name
+        self.type = type
+        self.data = data
+        self.location = Vector(location)
+        self.rotation_euler = Vector((0, 0, 0))
+        self.scale = Vector((1, 1, 1))
+        self.matrix_world = Matrix.Translation(location)
+        self.bound_box = [(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 0)]
+        self.modifiers = Modifiers()
+        self.material_slots = []
+        self.constraints = []
+        self.animation_data = None
+        self.parent = None
+        self.hide_render = False
+        if isinstance(data, Mesh):
+            data.users += 1
+
+    def select_set(self, state):
+        if state:
+            ops._selected.add(self)
+        else:
+            ops._selected.discard(self)
+
+    def evaluated_get(self, depsgraph):
+        return self
+
+    def to_mesh(self):
+        # A copy, like Blender's: callers may transform it in place
+        return copy.deepcopy(self.data)
+
+    def to_mesh_clear(self):
+        pass
+
+
+class Camera:
+    def __init__(self, name):
+        self.name = name
+        self.lens = 50.0
+
+
+class Light:
+    bl_rna = _RNA("energy", "cutoff_distance", "spot_size")
+
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.color = (1.0, 1.0, 1.0)
+        self.energy = 1000.0
+        self.cutoff_distance = 40.0
+        self.spot_size = 0.785
+
+
+types.Light = Light
+
+
+class IDCollection(Collection):
+    """bpy.data.<ids>: adds new() and remove() to the plain collection."""
+
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+
+    def new(self, name, *args, **kwargs):
+        item = self.factory(name, *args, **kwargs)
+        self.append(item)
+        return item
+
+    def remove(self, item):
+        super().remove(item)
+        self._by_name.pop(item.name, None)
+
+
+class BlendData:
+    def __init__(self):
+        self.objects = IDCollection(lambda name, data: Object(name, "MESH", data))
+        self.cameras = Collection()
+        self.lights = Collection()
+        self.meshes = IDCollection(Mesh)
+        self.materials = IDCollection(Material)
+        self.images = IDCollection(Image)
+        self.filepath = ""
+        self.is_dirty = True
+
+    def clear(self):
+        self.objects.clear()
+        self.cameras.clear()
+        self.lights.clear()
+        self.meshes.clear()
+        self.materials.clear()
+        self.images.clear()
+
+
+data = BlendData()
+context = _types.SimpleNamespace(
+    scene=Scene(),
+    view_layer=_types.SimpleNamespace(objects=_types.SimpleNamespace(active=None)),
+    evaluated_depsgraph_get=lambda: None,
+)
+
+
+class _Ops:
+    """bpy.ops with a stubbed glTF exporter that records call count and time."""
+
+    def __init__(self):
+        self._selected = set()
+        self.write_assets = False
+        self.exporter_calls = 0
+        self.exporter_seconds = 0.0
+        self.bake_calls = 0
+        self.object = _types.SimpleNamespace(select_all=self._select_all, bake=self._bake)
+        self.uv = _types.SimpleNamespace(lightmap_pack=lambda **kwargs: {'FINISHED'})
+        self.export_scene = _types.SimpleNamespace(gltf=self._gltf)
+        self.wm = _types.SimpleNamespace(save_as_mainfile=lambda **kwargs: {'FINISHED'})
+
+    def _select_all(self, action):
+        # Real select_all walks the whole view layer; the stub only clears what is selected
+        for obj in list(self._selected):
+            obj.select_set(action == 'SELECT')
+        return {'FINISHED'}
+
+    def _bake(self, **kwargs):
+        # Nothing is rendered; the atlas keeps its cleared pixels
+        self.bake_calls += 1
+        return {'FINISHED'}
+
+    def _gltf(self, filepath, **kwargs):
+        start = time.perf_counter()
+        if self.write_assets:
+            with open(filepath, "wb") as file:
+                file.write(b"glTF" + len(self._selected).to_bytes(4, "little"))
+        self.exporter_calls += 1
+        self.exporter_seconds += time.perf_counter() - start
+        return {'FINISHED'}
+
+    def reset(self):
+        self._selected.clear()
+        self.exporter_calls = 0
+        self.exporter_seconds = 0.0
+        self.bake_calls = 0
+
+
+ops = _Ops()
+path = _types.SimpleNamespace(abspath=lambda filepath, library=None: os.path.abspath(filepath))
+app = _types.SimpleNamespace(binary_path="blender")
+
+
+def _register_class(cls):
+    # Operators become callable as bpy.ops.<category>.<name>(), always through execute()
+    if "." in getattr(cls, "bl_idname", ""):
+        category, name = cls.bl_idname.split(".")
+        if not hasattr(ops, category):
+            setattr(ops, category, _types.SimpleNamespace())
+        setattr(getattr(ops, category), name, lambda: cls().execute(context))
+
+
+utils = _types.SimpleNamespace(register_class=_register_class, unregister_class=lambda cls: None)
@@ -0,0 +1,100 @@
+"""Just enough of Blender's mathutils for the exporter to run outside Blender."""
+
+
+class Vector:
+    __slots__ = ("_values",)
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._values = [float(value) for value in values]
+
+    x = property(lambda self: self._values[0])
+    y = property(lambda self: self._values[1])
+    z = property(lambda self: self._values[2])
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __radd__(self, other):
+        # sum() starts from 0
+        return self if other == 0 else self + other
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __truediv__(self, scalar):
+        return Vector(a / scalar for a in self)
+
+    @property
+    def length(self):
+        return sum(a * a for a in self._values) ** 0.5
+
+    def to_matrix(self):
+        # Only used on rotation_euler; synthetic scenes keep rotations at zero
+        return Matrix(((1, 0, 0), (0, 1, 0), (0, 0, 1)))
+
+    def __repr__(self):
+        return f"Vector({tuple(self._values)})"
+
+
+class Quaternion:
+    __slots__ = ("w", "x", "y", "z")
+
+    def __init__(self, values=(1.0, 0.0, 0.0, 0.0)):
+        self.w, self.x, self.y, self.z = (float(value) for value in values)
+
+    def dot(self, other):
+        return self.w * other.w + self.x * other.x + self.y * other.y + self.z * other.z
+
+    def negate(self):
+        self.w, self.x, self.y, self.z = -self.w, -self.x, -self.y, -self.z
+
+
+class Matrix:
+    __slots__ = ("_rows",)
+
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[float(row == col) for col in range(4)] for row in range(4)]
+        self._rows = [[float(value) for value in row] for row in rows]
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __matmul__(self, other):
+        size = len(self._rows)
+        if isinstance(other, Matrix):
+            return Matrix(
+                [sum(self._rows[row][k] * other._rows[k][col] for k in range(size)) for col in range(size)]
+                for row in range(size)
+            )
+        # 4x4 @ 3D vector treats the vector as a point, like mathutils
+        point = list(other) + [1.0] * (size - len(other))
+        return Vector([sum(a * b for a, b in zip(row, point)) for row in self._rows][:len(other)])
+
+    def inverted(self):
+        # The exporter only inverts the orthonormal Z-up -> Y-up axis swap
+        return Matrix(zip(*self._rows))
+
+    def decompose(self):
+        # Synthetic objects are never rotated or scaled
+        return self.translation, Quaternion(), Vector((1.0, 1.0, 1.0))
+
+    @property
+    def translation(self):
+        return Vector(row[3] for row in self._rows[:3])
+
+    @classmethod
+    def Translation(cls, vector):
+        matrix = cls()
+        for axis, value in enumerate(vector):
+            matrix._rows[axis][3] = float(value)
+        return matrix
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Stands in for the Blender executable, e.g. `batch_export.py --blender benchmarks/stub_blender.py`.
+
+Understands `stub_blender.py -b <file.blend> --python <script.py> -- <args>`: the script runs
+against fake_bpy on a synthetic scene. A stub .blend is a text file holding the object count;
+one holding "fail" makes the stub exit with an error instead.
+"""
+import os
+import runpy
+import sys
+
+import bench_export  # also puts fake_bpy and three-blender on sys.path
+import bpy
+
+
+def main(argv):
+    blend_path = argv[argv.index("-b") + 1]
+    script_path = argv[argv.index("--python") + 1]
+    with open(blend_path) as file:
+        contents = file.read().strip()
+    if contents == "fail":
+        print(f"Error: cannot read {blend_path}", file=sys.stderr)
+        return 3
+
+    bench_export.build_scene(int(contents or 10))
+    bpy.data.filepath = os.path.abspath(blend_path)
+    bpy.data.is_dirty = False
+    sys.argv = [argv[0]] + argv[argv.index("--"):]
+    runpy.run_path(script_path, run_name="__main__")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
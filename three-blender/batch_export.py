@@ -0,0 +1,190 @@
+"""Export many .blend files to Three.js pages with a pool of background Blender processes.
+
+    python batch_export.py "scenes/**/*.blend" --output public/ --jobs 4
+    python batch_export.py a.blend b.blend --output public/ --set threejs_use_draco=true --summary summary.json
+
+Each file is exported by `blender -b <file> --python plugin.py -- --threejs-export <job.json>`
+into <output>/<path of the file relative to --root (default: the current folder), without .blend>/index.html.
+Files whose mtime, or else content hash, and settings are unchanged since their last successful
+export are skipped; state is kept in <output>/batch_state.json. Runs on plain Python, no bpy needed.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugin.py")
+# Kept in sync with plugin.py, which cannot be imported without bpy
+EXPORT_FLAG = "--threejs-export"
+EXPORT_REPORT = "export_report.json"
+BATCH_STATE = "batch_state.json"
+
+def expand_sources(patterns):
+    sources = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if any(char in pattern for char in "*?[") else [pattern]
+        sources += [os.path.abspath(path) for path in matches if path.endswith(".blend")]
+    # A file matched by two patterns is only exported once
+    return list(dict.fromkeys(sources))
+
+def output_dirs(sources, output_root, root):
+    # Relative to a fixed root, not to this run's sources, so a file keeps its page and skip state across runs
+    return {
+        source: os.path.join(output_root, os.path.splitext(os.path.relpath(source, root))[0])
+        for source in sources
+    }
+
+def file_hash(path):
+    hasher = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def parse_setting(text):
+    key, sep, value = text.partition("=")
+    if not key.startswith("threejs_") or not sep:
+        raise argparse.ArgumentTypeError(f"expected threejs_<property>=<value>, got '{text}'")
+    if value.lower() in ("true", "false"):
+        return key, value.lower() == "true"
+    for convert in (int, float):
+        try:
+            return key, convert(value)
+        except ValueError:
+            pass
+    return key, value
+
+def is_unchanged(entry, source, html_path, settings):
+    # Whether the last successful export of source still stands; refreshes the entry's mtime
+    if not entry or not entry.get("ok") or entry.get("settings") != settings or not os.path.exists(html_path):
+        return False
+    mtime = os.path.getmtime(source)
+    if entry["mtime"] == mtime:
+        return True
+    # Touched but identical, e.g. a fresh checkout: only the hash tells
+    if entry["sha1"] == file_hash(source):
+        entry["mtime"] = mtime
+        return True
+    return False
+
+def export_file(blender_path, source, html_path, settings, job_dir, timeout):
+    # Exports one .blend in a background Blender; returns (error or None, seconds, assets written)
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+    stem = hashlib.sha1(source.encode()).hexdigest()[:12]
+    job_path = os.path.join(job_dir, f"job_{stem}.json")
+    result_path = os.path.join(job_dir, f"result_{stem}.json")
+    with open(job_path, "w") as file:
+        json.dump({"html": html_path, "settings": settings, "results": result_path}, file)
+
+    start = time.perf_counter()
+    command = [blender_path, "-b", source, "--python", PLUGIN_PATH, "--", EXPORT_FLAG, job_path]
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        stderr = process.stderr.strip().splitlines()
+        failure = f"blender exited with code {process.returncode}" + (f": {stderr[-1]}" if stderr else "")
+    except subprocess.TimeoutExpired:
+        failure = f"timed out after {timeout} s"
+    except OSError as e:
+        failure = f"could not start blender: {e}"
+    seconds = time.perf_counter() - start
+
+    try:
+        with open(result_path) as file:
+            result = json.load(file)
+    except (OSError, ValueError):
+        return failure, seconds, 0
+    if not result["finished"]:
+        return result["status"] or failure, seconds, 0
+
+    try:
+        with open(os.path.join(os.path.dirname(html_path), EXPORT_REPORT)) as file:
+            report = json.load(file)
+    except (OSError, ValueError):
+        report = {}
+    if report.get("failures"):
+        return f"{len(report['failures'])} objects failed: {', '.join(report['failures'])}", seconds, len(report.get("assets", []))
+    return None, seconds, len(report.get("assets", []))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help=".blend files or glob patterns (quote them; ** recurses)")
+    parser.add_argument("--output", required=True, help="root folder for the exported pages")
+    parser.add_argument("--root", default=os.getcwd(), help="folder the pages' paths under --output mirror (default: current folder)")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable (default: $BLENDER or blender)")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Blender processes at a time")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds before a single export is abandoned")
+    parser.add_argument("--set", type=parse_setting, action="append", default=[], metavar="PROP=VALUE",
+                        help="scene property for every file, e.g. threejs_export_mode=BATCHED")
+    parser.add_argument("--force", action="store_true", help="export every file, changed or not")
+    parser.add_argument("--summary", help="also write the summary as JSON to this file")
+    args = parser.parse_args(argv)
+
+    sources = expand_sources(args.sources)
+    root = os.path.abspath(args.root)
+    outside = [source for source in sources if os.path.commonpath([root, source]) != root]
+    if outside:
+        parser.error(f"{outside[0]} is not inside --root {root}")
+    settings = dict(args.set)
+    output_root = os.path.abspath(args.output)
+    os.makedirs(output_root, exist_ok=True)
+    state_path = os.path.join(output_root, BATCH_STATE)
+    try:
+        with open(state_path) as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        state = {}
+
+    html_paths = {source: os.path.join(out_dir, "index.html") for source, out_dir in output_dirs(sources, output_root, root).items()}
+    pending = []
+    skipped = []
+    for source in sources:
+        if not args.force and is_unchanged(state.get(source), source, html_paths[source], settings):
+            skipped.append(source)
+        else:
+            pending.append(source)
+
+    start = time.perf_counter()
+    exported = []
+    failed = []
+    with tempfile.TemporaryDirectory(prefix="threejs_batch_") as job_dir:
+        def run(source):
+            # Taken before the export, so edits saved while it runs are picked up next time
+            entry = {"mtime": os.path.getmtime(source), "sha1": file_hash(source), "settings": settings}
+            print(f"Exporting {source}", flush=True)
+            return entry, export_file(args.blender, source, html_paths[source], settings, job_dir, args.timeout)
+
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            for source, (entry, (error, seconds, assets)) in zip(pending, pool.map(run, pending)):
+                state[source] = {**entry, "ok": error is None}
+                if error is None:
+                    exported.append({"file": source, "seconds": round(seconds, 3), "assets": assets})
+                else:
+                    failed.append({"file": source, "seconds": round(seconds, 3), "error": error})
+
+    with open(state_path, "w") as file:
+        json.dump(state, file, indent=1)
+
+    summary = {
+        "seconds": round(time.perf_counter() - start, 3),
+        "exported": exported,
+        "skipped": skipped,
+        "failed": failed,
+    }
+    print(f"{len(exported)} exported, {len(skipped)} skipped, {len(failed)} failed in {summary['seconds']:.1f} s")
+    for entry in sorted(exported, key=lambda entry: entry["seconds"], reverse=True)[:5]:
+        print(f"  {entry['seconds']:8.1f} s  {entry['file']} ({entry['assets']} assets)")
+    for entry in failed:
+        print(f"  FAILED  {entry['file']}: {entry['error']}")
+    if args.summary:
+        with open(args.summary, "w") as file:
+            json.dump(summary, file, indent=1)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
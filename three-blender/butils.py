@@ -1,23 +1,65 @@
+import re
+
+ACCENT_MAP = {
+    "á": "a", "à": "a", "ã": "a", "â": "a", "ä": "ae", "å": "a",
+    "č": "c", "ć": "c",
+    "é": "e", "è": "e", "ê": "e", "ë": "e",
+    "í": "i", "ì": "i", "î": "i", "ï": "i",
+    "ñ": "n",
+    "ó": "o", "ò": "o", "ô": "o", "ö": "oe", "õ": "o", "ø": "o",
+    "ř": "r",
+    "š": "s", "ß": "ss",
+    "ú": "u", "ù": "u", "û": "u", "ü": "ue", "ũ": "u",
+    "ý": "y", "ž": "z"
+}
+
+# Accents, both cases, and the separators Blender names are full of, applied in one str.translate pass.
+# ß has no single-character capital, so only its lower case is mapped
+NAME_TRANSLATION = str.maketrans({
+    **{accented.upper(): plain.upper() for accented, plain in ACCENT_MAP.items() if len(accented.upper()) == 1},
+    **ACCENT_MAP,
+    " ": "_", "-": "_", ".": "_",
+})
+# Whatever translate leaves that still cannot appear in a JS identifier
+INVALID_IDENTIFIER = re.compile(r"[^0-9A-Za-z_$]")
+
+# Keywords and the browser globals a generated page relies on, which no scene name may shadow
+JS_RESERVED = frozenset("""
+    await break case catch class const continue debugger default delete do else enum export extends
+    false finally for function if implements import in instanceof interface let new null package
+    private protected public return static super switch this throw true try typeof var void while
+    with yield arguments eval undefined NaN Infinity
+    window document console performance fetch setTimeout requestAnimationFrame WebSocket JSON Math
+    Object Array Map Set Promise Date Number String Error Float32Array Uint8Array Uint16Array Uint32Array
+""".split())
+
 def safe_name(name: str):
-    ACCENT_MAP = {
-        "á": "a", "à": "a", "ã": "a", "â": "a", "ä": "ae", "å": "a",
-        "č": "c", "ć": "c", 
-        "é": "e", "è": "e", "ê": "e", "ë": "e", 
-        "í": "i", "ì": "i", "î": "i", "ï": "i",
-        "ñ": "n",
-        "ó": "o", "ò": "o", "ô": "o", "ö": "oe", "õ": "o", "ø": "o",
-        "ř": "r",
-        "š": "s", "ß": "ss",
-        "ú": "u", "ù": "u", "û": "u", "ü": "ue", "ũ": "u",
-        "ý": "y", "ž": "z"
-    }
-    
-    for accented, plain in ACCENT_MAP.items():
-        name = name.replace(accented, plain)
-        name = name.replace(accented.upper(), plain.upper())
-    name = (
-        name.replace(" ", "_")
-            .replace("-", "_")
-            .replace(".", "_")
-    )
-    return name
\ No newline at end of file
+    name = INVALID_IDENTIFIER.sub("_", name.translate(NAME_TRANSLATION))
+    # Identifiers cannot start with a digit, and empty names still need something to declare
+    if not name or name[0].isdigit():
+        name = "_" + name
+    return name
+
+class SymbolTable:
+    # One memoized, unique JS identifier per Blender name of an export (numbered in sorted order), plus name to object lookup
+    def __init__(self, objects=(), names=(), reserved=()):
+        self.objects = {obj.name: obj for obj in objects}
+        self.symbols = {}
+        self.taken = set(JS_RESERVED).union(reserved)
+        for name in sorted(set(self.objects).union(names)):
+            self.name(name)
+
+    def name(self, name: str):
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            base = symbol = safe_name(name)
+            suffix = 2
+            while symbol in self.taken:
+                symbol = f"{base}_{suffix}"
+                suffix += 1
+            self.taken.add(symbol)
+            self.symbols[name] = symbol
+        return symbol
+
+    def get(self, name, default=None):
+        return self.objects.get(name, default)
@@ -0,0 +1,104 @@
+"""Print the deltas a running Three.js live link sends, without a browser.
+
+    python live_client.py                    # follow ws://localhost:8765 until interrupted
+    python live_client.py --port 9000 --count 3 --timeout 10
+
+Each message is printed as one line of JSON, exactly as the page's applyLiveDelta() gets it.
+The first message after connecting is the snapshot of everything changed since the export.
+Runs on plain Python, no bpy needed.
+"""
+import argparse
+import base64
+import json
+import os
+import socket
+import struct
+import sys
+
+def connect(host, port, timeout):
+    conn = socket.create_connection((host, port), timeout=timeout)
+    key = base64.b64encode(os.urandom(16))
+    conn.sendall(
+        b"GET / HTTP/1.1\r\nHost: " + f"{host}:{port}".encode() + b"\r\n"
+        b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        b"Sec-WebSocket-Key: " + key + b"\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    )
+    response = b""
+    while b"\r\n\r\n" not in response:
+        chunk = conn.recv(4096)
+        if not chunk:
+            raise ConnectionError("connection closed during the handshake")
+        response += chunk
+    if not response.startswith(b"HTTP/1.1 101"):
+        raise ConnectionError(response.split(b"\r\n", 1)[0].decode(errors="replace"))
+    # Anything after the headers is already the first frame
+    return conn, response.split(b"\r\n\r\n", 1)[1]
+
+def read_messages(conn, buffered):
+    # Yields the text of every frame the server sends; servers never mask or fragment here
+    data = buffered
+
+    def read(count):
+        nonlocal data
+        while len(data) < count:
+            chunk = conn.recv(65536)
+            if not chunk:
+                raise ConnectionError("connection closed")
+            data += chunk
+        taken, data = data[:count], data[count:]
+        return taken
+
+    while True:
+        first, second = read(2)
+        length = second & 0x7f
+        if length == 126:
+            length = struct.unpack("!H", read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", read(8))[0]
+        payload = read(length)
+        opcode = first & 0x0f
+        if opcode == 0x8:
+            return
+        if opcode == 0x1:
+            yield payload.decode()
+
+def close(conn):
+    # Client frames must be masked; an all-zero mask leaves the payload as is
+    try:
+        conn.sendall(struct.pack("!BB", 0x88, 0x80) + b"\0\0\0\0")
+    except OSError:
+        pass
+    conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--count", type=int, default=0, help="exit after this many messages (0 follows forever)")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds to wait for each message")
+    args = parser.parse_args(argv)
+
+    try:
+        conn, buffered = connect(args.host, args.port, args.timeout)
+    except OSError as e:
+        print(f"could not connect to ws://{args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+
+    received = 0
+    try:
+        for message in read_messages(conn, buffered):
+            print(json.dumps(json.loads(message), sort_keys=True), flush=True)
+            received += 1
+            if received == args.count:
+                break
+    except socket.timeout:
+        print(f"no message within {args.timeout} s", file=sys.stderr)
+        return 1
+    except (OSError, KeyboardInterrupt):
+        pass
+    finally:
+        close(conn)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
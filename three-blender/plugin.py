@@ -10,10 +10,692 @@ bl_info = {
 }
 
 import bpy
+import bmesh
+import base64
+import hashlib
+import json
+import math
 import os
-from bpy.props import StringProperty
+import posixpath
+import queue
+import re
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from array import array
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from bpy.props import StringProperty, EnumProperty, IntProperty, BoolProperty, FloatProperty
 from bpy.types import Panel, Operator
-from mathutils import Vector
+from mathutils import Vector, Matrix
+
+try:
+    from butils import SymbolTable
+except ImportError:
+    # Run as a script (workers, batch_export.py) the add-on's own folder is not on sys.path
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from butils import SymbolTable
+
+# Blender is Z-up, three.js is Y-up: (x, y, z) -> (x, z, -y)
+Y_UP = Matrix((
+    (1, 0, 0, 0),
+    (0, 0, 1, 0),
+    (0, -1, 0, 0),
+    (0, 0, 0, 1),
+))
+
+JS_BUFFER_SIZE = 1024 * 1024
+# Top-level names the generated script declares itself, plus the loader callbacks' gltf parameter
+# that object constants share a scope with, kept out of the scene's identifiers
+SCRIPT_GLOBALS = frozenset("""
+    THREE OrbitControls GLTFLoader DRACOLoader KTX2Loader gltf
+    scene camera renderer controls loader dracoLoader ktx2Loader textureLoader lightmapLoader clock mixer
+    animate render requestRender renderRequested placeNode addInstances addLodChain updateLodChains lodChains
+    addStaticBatch staticObjectName attachBvh raycastBvh bvhBox bvhRay bvhInverse bvhCorners bvhPoint
+    loadAsset loadQueue pumpLoadQueue queuedLoad nextLoad activeLoads finishedLoads
+    loadSharedTexture sharedTextures materialTextures loadLightmap lightmaps lightmapAtlases bakedMaterial
+    loadUntextured loadUnbaked loadUnshadowed loadWithoutBvh
+    lightTypes trackTypes animationClips animationTargets animateObject
+    loadAnimations playAnimation applyLiveDelta connectLiveLink
+""".split())
+CACHE_MANIFEST = "export_cache.json"
+CACHE_VERSION = 2
+# Editor-only state that never reaches the exported asset
+FINGERPRINT_SKIP = {"rna_type", "select", "location", "width", "height", "dimensions", "show_expanded"}
+
+def rna_fingerprint(struct):
+    # Stable text form of an RNA struct's plain properties (pointers by name, arrays as tuples)
+    parts = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in FINGERPRINT_SKIP or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == 'POINTER':
+            value = getattr(value, "name", None)
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        parts.append(f"{prop.identifier}={value!r}")
+    return ";".join(parts)
+
+class ExportCache:
+    # Manifest of exported assets keyed by file name, so unchanged meshes skip the glTF exporter
+    def __init__(self, manifest_path, enabled=True):
+        self.manifest_path = manifest_path
+        self.enabled = enabled
+        self.previous = {}
+        self.assets = {}
+        self.hits = 0
+        self.misses = 0
+        self.image_digests = {}
+        try:
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+            if manifest.get("version") == CACHE_VERSION:
+                self.previous = manifest.get("assets", {})
+        except (OSError, ValueError):
+            pass
+    
+    def digest(self, objs, settings):
+        hasher = hashlib.sha1(repr(sorted(settings.items())).encode())
+        for obj in objs:
+            self.hash_object(hasher, obj)
+        return hasher.hexdigest()
+    
+    def hash_object(self, hasher, obj):
+        # The page places the glTF node itself, so location and rotation are left out; the name and scale stay in the asset
+        hasher.update(obj.name.encode())
+        hasher.update(repr(tuple(obj.scale)).encode())
+        
+        mesh = obj.data
+        for collection, attr, width, typecode in (
+            (mesh.vertices, "co", 3, 'f'),
+            (mesh.loops, "vertex_index", 1, 'i'),
+            (mesh.polygons, "loop_total", 1, 'i'),
+            (mesh.polygons, "material_index", 1, 'i'),
+        ):
+            values = array(typecode, bytes(array(typecode).itemsize * len(collection) * width))
+            collection.foreach_get(attr, values)
+            hasher.update(values.tobytes())
+        smooth = [False] * len(mesh.polygons)
+        mesh.polygons.foreach_get("use_smooth", smooth)
+        hasher.update(bytes(smooth))
+        for layer in mesh.uv_layers:
+            uvs = array('f', bytes(4 * len(mesh.loops) * 2))
+            layer.data.foreach_get("uv", uvs)
+            hasher.update(layer.name.encode())
+            hasher.update(uvs.tobytes())
+        
+        for modifier in obj.modifiers:
+            hasher.update(rna_fingerprint(modifier).encode())
+        
+        for slot in obj.material_slots:
+            material = slot.material
+            if not material:
+                continue
+            hasher.update(rna_fingerprint(material).encode())
+            if material.use_nodes and material.node_tree:
+                for node in material.node_tree.nodes:
+                    hasher.update(rna_fingerprint(node).encode())
+                    for socket in node.inputs:
+                        value = getattr(socket, "default_value", None)
+                        if hasattr(value, "__len__") and not isinstance(value, str):
+                            value = tuple(value)
+                        hasher.update(f"{socket.identifier}={value!r}".encode())
+                    image = getattr(node, "image", None)
+                    if image:
+                        # Content, not path, so a repainted image under the same name is picked up
+                        hasher.update(self.image_digest(image).encode())
+                for link in material.node_tree.links:
+                    hasher.update(f"{link.from_node.name}.{link.from_socket.identifier}->{link.to_node.name}.{link.to_socket.identifier}".encode())
+    
+    def image_digest(self, image):
+        # Read and hashed once per export however many meshes, LOD levels and bakes use the image;
+        # mtime and size in the key still catch a repaint while the live link keeps this cache
+        if image.packed_file:
+            key = (image.name, "packed", image.packed_file.size)
+        else:
+            source_path = bpy.path.abspath(image.filepath, library=image.library) if image.filepath else ""
+            try:
+                stat = os.stat(source_path)
+                key = (image.name, source_path, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                key = (image.name, source_path)
+        digest = self.image_digests.get(key)
+        if digest is None:
+            source = image_bytes(image)
+            digest = hashlib.sha1(source).hexdigest() if source is not None else image.name
+            self.image_digests[key] = digest
+        return digest
+    
+    def is_fresh(self, export_path, digest):
+        entry = self.previous.get(os.path.basename(export_path))
+        return (
+            self.enabled and entry is not None and entry["hash"] == digest
+            and all(os.path.exists(path) for path in asset_files(export_path))
+        )
+    
+    def record(self, export_path, digest, objs, hit, triangles=None):
+        filename = os.path.basename(export_path)
+        if triangles is None and hit:
+            triangles = self.previous[filename].get("triangles")
+        if triangles is None:
+            triangles = sum(mesh_triangles(obj.data) for obj in objs)
+        self.assets[filename] = {
+            "hash": digest,
+            "objects": [obj.name for obj in objs],
+            "files": [os.path.basename(path) for path in asset_files(export_path)],
+            "bytes": sum(os.path.getsize(path) for path in asset_files(export_path) if os.path.exists(path)),
+            "triangles": triangles,
+        }
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+    
+    def prune(self, export_dir):
+        # Only files this exporter wrote before are ever removed
+        kept = {filename for entry in self.assets.values() for filename in entry["files"]}
+        for filename, entry in self.previous.items():
+            for stale in entry.get("files", [filename]):
+                stale_path = os.path.join(export_dir, stale)
+                if stale not in kept and os.path.exists(stale_path):
+                    os.remove(stale_path)
+    
+    def save(self, partial=False):
+        # An interrupted export also keeps the entries it never got to, so a rerun only redoes those
+        assets = {**self.previous, **self.assets} if partial else self.assets
+        with open(self.manifest_path, "w") as file:
+            json.dump({"version": CACHE_VERSION, "assets": assets}, file, indent=1)
+    
+    def summary(self):
+        megabytes = sum(entry["bytes"] for entry in self.assets.values()) / (1024 * 1024)
+        return f"cache: {self.hits} hits, {self.misses} misses, {megabytes:.1f} MB of assets"
+
+def image_bytes(image):
+    if image.packed_file:
+        return image.packed_file.data
+    if image.filepath:
+        source_path = bpy.path.abspath(image.filepath, library=image.library)
+        if os.path.exists(source_path):
+            with open(source_path, "rb") as file:
+                return file.read()
+    return None
+
+def mesh_triangles(mesh):
+    loop_totals = array('i', [0]) * len(mesh.polygons)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    return sum(loop_totals) - 2 * len(loop_totals)
+
+ANIMATION_DATA = "animations.bin"
+TRACK_SIZES = {"position": 3, "quaternion": 4, "scale": 3}
+
+def reduce_keyframes(times, values, size, tolerance):
+    # Drops samples that linear interpolation between the kept neighbours reproduces within tolerance
+    def sample(index):
+        return values[index * size:(index + 1) * size]
+    
+    def fits(start, end):
+        first, last = sample(start), sample(end)
+        span = times[end] - times[start]
+        for index in range(start + 1, end):
+            t = (times[index] - times[start]) / span
+            for a, b, value in zip(first, last, sample(index)):
+                if abs(a + (b - a) * t - value) > tolerance:
+                    return False
+        return True
+    
+    kept = [0]
+    for index in range(1, len(times) - 1):
+        if not fits(kept[-1], index + 1):
+            kept.append(index)
+    if len(times) > 1:
+        kept.append(len(times) - 1)
+    if len(kept) == 2 and all(abs(a - b) <= tolerance for a, b in zip(sample(0), sample(kept[1]))):
+        kept = [0]
+    return [times[index] for index in kept], [value for index in kept for value in sample(index)]
+
+BVH_EXT = ".bvh"
+BVH_MAGIC = b"BVH1"
+BVH_LEAF_SIZE = 8
+
+def build_bvh(positions):
+    # Median-split BVH over 9-float triangles: the triangle order, and depth-first [min xyz, max xyz, offset, count] nodes
+    count = len(positions) // 9
+    centroids = [
+        [(positions[base + axis] + positions[base + 3 + axis] + positions[base + 6 + axis]) / 3 for axis in range(3)]
+        for base in range(0, count * 9, 9)
+    ]
+    order = list(range(count))
+    nodes = []
+    stack = [(0, count, None)]
+    while stack:
+        start, end, parent = stack.pop()
+        index = len(nodes)
+        if parent is not None:
+            nodes[parent][6] = index
+        if end - start <= BVH_LEAF_SIZE:
+            bounds = [math.inf] * 3 + [-math.inf] * 3
+            for triangle in order[start:end]:
+                for corner in range(3):
+                    for axis in range(3):
+                        value = positions[triangle * 9 + corner * 3 + axis]
+                        bounds[axis] = min(bounds[axis], value)
+                        bounds[axis + 3] = max(bounds[axis + 3], value)
+            nodes.append(bounds + [start, end - start])
+            continue
+        
+        # Split at the median centroid along the axis the centroids spread furthest
+        spans = [
+            max(centroids[triangle][axis] for triangle in order[start:end]) - min(centroids[triangle][axis] for triangle in order[start:end])
+            for axis in range(3)
+        ]
+        axis = spans.index(max(spans))
+        order[start:end] = sorted(order[start:end], key=lambda triangle: centroids[triangle][axis])
+        middle = (start + end) // 2
+        nodes.append([0.0] * 6 + [0, 0])
+        stack.append((middle, end, index))
+        stack.append((start, middle, None))
+    
+    # Children always come after their parent, so one backwards pass fills in the inner bounds
+    for node_index in range(len(nodes) - 1, -1, -1):
+        node = nodes[node_index]
+        if node[7] == 0 and count:
+            left, right = nodes[node_index + 1], nodes[node[6]]
+            node[:6] = [min(left[axis], right[axis]) for axis in range(3)] + [max(left[axis], right[axis]) for axis in range(3, 6)]
+    return order, nodes
+
+def asset_files(export_path):
+    # A .gltf export writes its buffers to a .bin of the same name; a BVH sidecar sits next to either
+    stem, ext = os.path.splitext(export_path)
+    files = [export_path, stem + ".bin"] if ext == ".gltf" else [export_path]
+    if os.path.exists(export_path + BVH_EXT):
+        files.append(export_path + BVH_EXT)
+    return files
+
+SCENE_MANIFEST = "scene.json"
+TEXTURE_DIR = "textures"
+TEXTURE_MANIFEST = "textures.json"
+LIGHTMAP_DIR = "lightmaps"
+LIGHTMAP_STATE = "lightmaps.json"
+LIGHTMAP_UV = "threejs_lightmap"
+LIGHTMAP_MARGIN = 4
+# Baked light is stored divided by this, so 8-bit PNGs keep some headroom above white
+LIGHTMAP_RANGE = 2.0
+# Principled BSDF inputs and the three.js material slots their image textures map to
+TEXTURE_SLOTS = (
+    ("Base Color", "map"),
+    ("Normal", "normalMap"),
+    ("Roughness", "roughnessMap"),
+    ("Metallic", "metalnessMap"),
+    ("Emission", "emissiveMap"),
+    ("Emission Color", "emissiveMap"),
+    ("Alpha", "alphaMap"),
+)
+# WebGLRenderer settings per panel profile; on-demand pages only draw after the camera moves,
+# the window resizes or something finishes loading, and shadows are drawn for opted-in lights only
+RENDERER_PROFILES = {
+    'ON_DEMAND': {"on_demand": True, "antialias": False, "pixel_ratio": 1.0, "power": "low-power", "shadow_type": None, "shadow_size": 0},
+    'BALANCED': {"on_demand": True, "antialias": True, "pixel_ratio": 1.5, "power": "default", "shadow_type": "PCFShadowMap", "shadow_size": 1024},
+    'QUALITY': {"on_demand": False, "antialias": True, "pixel_ratio": 2.0, "power": "high-performance", "shadow_type": "PCFSoftShadowMap", "shadow_size": 2048},
+}
+
+THREE_VERSION = "0.129.0"
+THREE_CDN = f"https://cdn.skypack.dev/three@{THREE_VERSION}/"
+# Vendored files come from here when no local three.js package is set
+THREE_UNPKG = f"https://unpkg.com/three@{THREE_VERSION}/"
+VENDOR_DIR = "vendor/three"
+BUNDLE_JS = "bundle.js"
+DRACO_DECODER = "examples/js/libs/draco/gltf/"
+BASIS_TRANSCODER = "examples/js/libs/basis/"
+RELATIVE_IMPORT = re.compile(r"""(?:\bfrom|\bimport)\s*['"](\.{1,2}/[^'"]+)['"]""")
+
+def vendor_three(source, target, paths):
+    # Copies three.js files and every module they import by relative path; returns how many were fetched
+    pending = list(paths)
+    seen = set()
+    fetched = 0
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        dest = os.path.join(target, *path.split("/"))
+        if not os.path.exists(dest):
+            if source.startswith(("http://", "https://")):
+                with urllib.request.urlopen(source + path, timeout=60) as response:
+                    content = response.read()
+            else:
+                with open(os.path.join(source, *path.split("/")), "rb") as file:
+                    content = file.read()
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with open(dest + ".tmp", "wb") as file:
+                file.write(content)
+            os.replace(dest + ".tmp", dest)
+            fetched += 1
+        if path.endswith(".module.js") or "/jsm/" in path:
+            with open(dest, encoding="utf-8") as file:
+                for spec in RELATIVE_IMPORT.findall(file.read()):
+                    pending.append(posixpath.normpath(posixpath.join(posixpath.dirname(path), spec)))
+    return fetched
+
+class SceneManifest:
+    # Streams scene.json as a few top-level arrays, one entry at a time
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path + ".tmp", "w", buffering=JS_BUFFER_SIZE)
+        self.sections = 0
+        self.entries = 0
+    
+    def begin(self, key):
+        self.file.write(("],\n" if self.sections else "{") + f'"{key}":[')
+        self.sections += 1
+        self.entries = 0
+    
+    def add(self, entry):
+        self.file.write(("," if self.entries else "") + "\n" + json.dumps(entry, separators=(",", ":")))
+        self.entries += 1
+    
+    def close(self):
+        self.file.write("]}\n")
+        self.file.close()
+        os.replace(self.path + ".tmp", self.path)
+    
+    def discard(self):
+        self.file.close()
+        os.remove(self.path + ".tmp")
+
+EXPORT_REPORT = "export_report.json"
+# The modal export runs slices of this many seconds, one per timer tick
+MODAL_SLICE = 0.1
+MODAL_TICK = 0.05
+
+class ExportProfile:
+    # Wall time per export phase (exclusive, so they add up) and per asset, for export_report.json
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mark = self.started
+        self.idle = 0.0
+        self.stack = []
+        self.phases = {}
+        self.assets = []
+    
+    def charge(self):
+        now = time.perf_counter()
+        if self.stack:
+            self.phases[self.stack[-1]] = self.phases.get(self.stack[-1], 0.0) + now - self.mark
+        self.mark = now
+    
+    def resume(self):
+        # Time between slices of a modal export is Blender's, not the exporter's
+        now = time.perf_counter()
+        self.idle += now - self.mark
+        self.mark = now
+    
+    @contextmanager
+    def phase(self, name):
+        self.charge()
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self.charge()
+            self.stack.pop()
+    
+    def record(self, export_path, seconds, entry, cached):
+        # seconds is None for assets exported by parallel workers, which are not timed one by one
+        self.assets.append({
+            "file": os.path.basename(export_path),
+            "objects": entry["objects"],
+            "seconds": seconds,
+            "bytes": entry["bytes"],
+            "triangles": entry["triangles"],
+            "cached": cached,
+        })
+    
+    def top(self, key, count):
+        timed = [asset for asset in self.assets if asset[key] is not None]
+        return sorted(timed, key=lambda asset: asset[key], reverse=True)[:count]
+    
+    def save(self, path, failures, error=None):
+        self.charge()
+        report = {
+            "total_seconds": round(self.mark - self.started - self.idle, 4),
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "assets": sorted(self.assets, key=lambda asset: asset["file"]),
+            "failures": failures,
+        }
+        if error:
+            report["error"] = error
+        with open(path, "w") as file:
+            json.dump(report, file, indent=1)
+    
+    def summary(self, count):
+        # A few short lines for the panel: phase times, then the slowest and largest assets
+        lines = ["Phases: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())]
+        lines.append(f"Slowest {count}:")
+        lines += [f"  {asset['file']}: {asset['seconds']:.2f} s" for asset in self.top("seconds", count)]
+        lines.append(f"Largest {count}:")
+        lines += [
+            f"  {asset['file']}: {asset['bytes'] / 1024:.0f} KB, {asset['triangles']} triangles"
+            for asset in self.top("bytes", count)
+        ]
+        return "\n".join(lines)
+
+WORKER_FLAG = "--threejs-worker"
+EXPORT_FLAG = "--threejs-export"
+
+def export_selection(objs, export_path, settings):
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objs:
+        obj.select_set(True)
+    bpy.ops.export_scene.gltf(filepath=export_path, use_selection=True, **settings)
+    for obj in objs:
+        obj.select_set(False)
+
+def run_export_workers(blender_path, blend_path, job_dir, shards, settings, pool_size):
+    # Exports shards of assets in background Blender processes; assets a worker never reported count as failed
+    def run_shard(index, shard):
+        job_path = os.path.join(job_dir, f"job_{index:03d}.json")
+        result_path = os.path.join(job_dir, f"result_{index:03d}.json")
+        with open(job_path, "w") as file:
+            json.dump({
+                "settings": settings,
+                "results": result_path,
+                "assets": [{"path": export_path, "objects": names} for export_path, names in shard],
+            }, file)
+        if os.path.exists(result_path):
+            os.remove(result_path)
+        
+        command = [blender_path, "-b", blend_path, "--python", os.path.abspath(__file__), "--", WORKER_FLAG, job_path]
+        try:
+            process = subprocess.run(command, capture_output=True, text=True)
+            stderr = process.stderr.strip().splitlines()
+            failure = f"worker exited with code {process.returncode}" + (f": {stderr[-1]}" if stderr else "")
+        except OSError as e:
+            failure = f"could not start worker: {e}"
+        
+        try:
+            with open(result_path) as file:
+                shard_results = json.load(file)
+        except (OSError, ValueError):
+            shard_results = {}
+        return {export_path: shard_results.get(export_path, failure) for export_path, _ in shard}
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=pool_size) as pool:
+        for shard_results in pool.map(run_shard, range(len(shards)), shards):
+            results.update(shard_results)
+    return results
+
+def run_export_worker(job_path):
+    with open(job_path) as file:
+        job = json.load(file)
+    
+    results = {}
+    for asset in job["assets"]:
+        try:
+            objs = [bpy.data.objects[name] for name in asset["objects"]]
+            export_selection(objs, asset["path"], job["settings"])
+            results[asset["path"]] = None
+        except Exception as e:
+            results[asset["path"]] = str(e)
+        # Written after every asset so a crashed worker still reports what it finished
+        with open(job["results"], "w") as file:
+            json.dump(results, file)
+
+def run_cli_export(job_path):
+    # Exports the open .blend for a batch_export.py job and reports back through the job's results file
+    with open(job_path) as file:
+        job = json.load(file)
+    
+    register()
+    scene = bpy.context.scene
+    for key, value in job["settings"].items():
+        setattr(scene, key, value)
+    scene.threejs_html_path = job["html"]
+    result = bpy.ops.threejs.export_scene()
+    with open(job["results"], "w") as file:
+        json.dump({"finished": 'FINISHED' in result, "status": scene.threejs_export_status}, file)
+
+LIVE_DIR = "live"
+# A mesh is re-exported once its geometry has not changed for this many seconds
+LIVE_SETTLE = 0.5
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+def ws_frame(payload, opcode=0x1):
+    # One unmasked, unfragmented frame, as a server sends them
+    if isinstance(payload, str):
+        payload = payload.encode()
+    if len(payload) < 126:
+        header = struct.pack("!BB", 0x80 | opcode, len(payload))
+    elif len(payload) < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, len(payload))
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, len(payload))
+    return header + payload
+
+def ws_read_frame(conn):
+    # Returns (opcode, payload), or (None, b"") once the connection is gone
+    def read(count):
+        data = b""
+        while len(data) < count:
+            chunk = conn.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("connection closed")
+            data += chunk
+        return data
+    
+    try:
+        first, second = read(2)
+        length = second & 0x7f
+        if length == 126:
+            length = struct.unpack("!H", read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", read(8))[0]
+        mask = read(4) if second & 0x80 else b"\0\0\0\0"
+        payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(read(length)))
+    except OSError:
+        return None, b""
+    return first & 0x0f, payload
+
+class LiveServer:
+    # Minimal localhost WebSocket server; late pages get the merged snapshot, a background thread does the sending
+    def __init__(self, port):
+        self.listener = socket.create_server(("localhost", port))
+        self.clients = []
+        self.snapshot = {}
+        self.lock = threading.Lock()
+        self.outbox = queue.Queue()
+        threading.Thread(target=self.accept_clients, daemon=True).start()
+        threading.Thread(target=self.send_deltas, daemon=True).start()
+    
+    def broadcast(self, delta):
+        self.outbox.put(delta)
+    
+    def close(self):
+        self.outbox.put(None)
+        try:
+            # close() alone does not wake the thread blocked in accept()
+            self.listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.listener.close()
+        with self.lock:
+            for conn in self.clients:
+                conn.close()
+            self.clients.clear()
+    
+    def accept_clients(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve_client, args=(conn,), daemon=True).start()
+    
+    def serve_client(self, conn):
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    return
+                request += chunk
+            key = re.search(rb"Sec-WebSocket-Key:\s*(\S+)", request, re.IGNORECASE)
+            if not key:
+                conn.sendall(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+                return
+            accept = base64.b64encode(hashlib.sha1(key.group(1) + WS_GUID).digest())
+            conn.sendall(
+                b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+            )
+            with self.lock:
+                if self.snapshot:
+                    conn.sendall(ws_frame(json.dumps(self.snapshot)))
+                self.clients.append(conn)
+            
+            # Pages never send data; reading only answers pings and notices when they go away
+            while True:
+                opcode, payload = ws_read_frame(conn)
+                if opcode is None or opcode == 0x8:
+                    return
+                if opcode == 0x9:
+                    with self.lock:
+                        conn.sendall(ws_frame(payload, 0xa))
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                if conn in self.clients:
+                    self.clients.remove(conn)
+            conn.close()
+    
+    def send_deltas(self):
+        while True:
+            delta = self.outbox.get()
+            if delta is None:
+                return
+            frame = ws_frame(json.dumps(delta))
+            with self.lock:
+                for section, entries in delta.items():
+                    self.snapshot.setdefault(section, {}).update(entries)
+                for conn in list(self.clients):
+                    try:
+                        conn.sendall(frame)
+                    except OSError:
+                        self.clients.remove(conn)
+                        conn.close()
+
+# The running live link, if any; its panel button stops it
+live_link = None
+# The modal export in progress, if any; a second export would write the same files
+modal_export = None
 
 class THREEJS_PT_export_panel(Panel):
     bl_label = "Three.js Export"
@@ -28,27 +710,204 @@ class THREEJS_PT_export_panel(Panel):
         
         layout.label(text="Export Scene to Three.js:")
         layout.prop(scene, "threejs_html_path", text="HTML File Path")
+        layout.prop(scene, "threejs_scene_format", text="Scene")
+        layout.prop(scene, "threejs_export_mode", text="Mode")
+        if scene.threejs_export_mode == 'BATCHED':
+            layout.prop(scene, "threejs_batch_size", text="Meshes per File")
+        elif scene.threejs_export_mode == 'PARALLEL':
+            layout.prop(scene, "threejs_worker_count", text="Workers")
+            layout.prop(scene, "threejs_blender_path", text="Blender Executable")
+        layout.prop(scene, "threejs_use_instancing", text="Instance Shared Meshes")
+        layout.prop(scene, "threejs_static_batching", text="Merge Static Meshes")
+        if scene.threejs_static_batching:
+            layout.prop(scene, "threejs_static_chunk_size", text="Chunk Size")
+        layout.prop(scene, "threejs_use_cache", text="Skip Unchanged Meshes")
+        
+        layout.label(text="Geometry:")
+        layout.prop(scene, "threejs_export_format", text="Format")
+        layout.prop(scene, "threejs_use_draco", text="Draco Compression")
+        if scene.threejs_use_draco:
+            col = layout.column(align=True)
+            col.prop(scene, "threejs_draco_level", text="Level")
+            col.prop(scene, "threejs_position_bits", text="Position Bits")
+            col.prop(scene, "threejs_normal_bits", text="Normal Bits")
+            col.prop(scene, "threejs_texcoord_bits", text="UV Bits")
+        layout.prop(scene, "threejs_log_asset_stats", text="Log Asset Size and Decode Time")
+        layout.prop(scene, "threejs_build_bvh", text="BVH Sidecars for Picking")
+        
+        layout.label(text="Textures:")
+        layout.prop(scene, "threejs_share_textures", text="Shared Texture Directory")
+        if scene.threejs_share_textures:
+            col = layout.column(align=True)
+            col.prop(scene, "threejs_texture_max_size", text="Max Size")
+            col.prop(scene, "threejs_texture_pow2", text="Power of Two")
+            col.prop(scene, "threejs_use_ktx2", text="KTX2 / Basis")
+            if scene.threejs_use_ktx2:
+                col.prop(scene, "threejs_ktx2_tool", text="toktx")
+        
+        layout.label(text="Level of Detail:")
+        layout.prop(scene, "threejs_use_lod", text="Generate LOD Chains")
+        if scene.threejs_use_lod:
+            col = layout.column(align=True)
+            col.prop(scene, "threejs_lod_ratios", text="Ratios")
+            col.prop(scene, "threejs_lod_min_triangles", text="Min Triangles")
+            col.prop(scene, "threejs_lod_distance_scale", text="Distance Scale")
+        
+        layout.label(text="Animation:")
+        layout.prop(scene, "threejs_export_animation", text="Bake Object Animation")
+        if scene.threejs_export_animation:
+            layout.prop(scene, "threejs_animation_tolerance", text="Tolerance")
+        
+        layout.label(text="Lightmaps:")
+        layout.prop(scene, "threejs_bake_lightmaps", text="Bake Static Lighting")
+        if scene.threejs_bake_lightmaps:
+            col = layout.column(align=True)
+            col.prop(scene, "threejs_lightmap_size", text="Atlas Size")
+            col.prop(scene, "threejs_lightmap_atlas_objects", text="Objects per Atlas")
+            col.prop(scene, "threejs_lightmap_samples", text="Samples")
+        
+        layout.label(text="Loading:")
+        layout.prop(scene, "threejs_progressive_loading", text="Nearest Objects First")
+        if scene.threejs_progressive_loading:
+            layout.prop(scene, "threejs_max_concurrent_loads", text="Concurrent Requests")
+        layout.prop(scene, "threejs_library_source", text="three.js")
+        if scene.threejs_library_source != 'CDN':
+            col = layout.column(align=True)
+            col.prop(scene, "threejs_three_path", text="Local Package")
+            if scene.threejs_library_source == 'BUNDLED':
+                col.prop(scene, "threejs_bundler", text="esbuild")
+        
+        layout.label(text="Renderer:")
+        layout.prop(scene, "threejs_renderer_profile", text="Profile")
+        if context.object and context.object.type == 'LIGHT':
+            layout.prop(context.object.data, "threejs_cast_shadow", text=f"{context.object.name} Casts Shadows")
+        
+        layout.label(text="Live Link:")
+        row = layout.row(align=True)
+        row.prop(scene, "threejs_live_port", text="Port")
+        row.prop(scene, "threejs_live_interval", text="Interval")
         
         row = layout.row()
         row.operator("threejs.export_scene", text="Export Scene")
+        row.operator("threejs.live_link", text="Stop Live Link" if live_link else "Start Live Link")
         
         # Status message
         if hasattr(scene, "threejs_export_status") and scene.threejs_export_status:
             box = layout.box()
             box.label(text=scene.threejs_export_status)
+        
+        layout.prop(scene, "threejs_report_top", text="Report Top Assets")
+        if scene.threejs_export_report:
+            box = layout.box()
+            for line in scene.threejs_export_report.splitlines():
+                box.label(text=line)
 
 class THREEJS_OT_export_scene(Operator):
     bl_idname = "threejs.export_scene"
     bl_label = "Export Three.js Scene"
     bl_description = "Export the current scene to Three.js format"
+    # Pages exported by the live link also get the client that applies its updates
+    live = False
+    # Filled by bake_lightmaps() during an export
+    lightmaps = {}
+    lightmap_uvs = []
+    lights_baked = False
     
     def execute(self, context):
+        if self.export_running(context):
+            return {'CANCELLED'}
+        paths = self.export_paths(context)
+        if not paths:
+            return {'CANCELLED'}
+        
+        try:
+            # Generate JavaScript and HTML files
+            self.export_threejs(*paths)
+        except Exception as e:
+            return self.export_failed(context, e)
+        self.export_finished(context, paths[0])
+        return {'FINISHED'}
+    
+    def invoke(self, context, event):
+        # From the UI the export runs as a modal operator, a slice per timer tick, so Blender
+        # keeps redrawing and Esc can stop it; scripts calling execute() still run it in one go
+        global modal_export
+        if self.export_running(context):
+            return {'CANCELLED'}
+        paths = self.export_paths(context)
+        if not paths:
+            return {'CANCELLED'}
+        
+        self.html_path = paths[0]
+        self.steps = self.export_steps(*paths)
+        self.done = 0
+        self.total = sum(1 for obj in bpy.data.objects if obj.type == "MESH")
+        wm = context.window_manager
+        wm.progress_begin(0, max(self.total, 1))
+        self.timer = wm.event_timer_add(MODAL_TICK, window=context.window)
+        wm.modal_handler_add(self)
+        modal_export = self
+        context.scene.threejs_export_status = f"Exporting: 0 / {self.total} meshes (Esc to cancel)"
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.steps.close()
+            self.end_modal(context)
+            context.scene.threejs_export_status = f"Cancelled after {self.done} / {self.total} meshes, exported assets are kept for the next export"
+            self.report({'WARNING'}, "Export cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        deadline = time.perf_counter() + MODAL_SLICE
+        try:
+            # At least one step per tick, however slow each step is
+            self.done += next(self.steps)
+            while time.perf_counter() < deadline:
+                self.done += next(self.steps)
+        except StopIteration:
+            self.end_modal(context)
+            self.export_finished(context, self.html_path)
+            return {'FINISHED'}
+        except Exception as e:
+            self.end_modal(context)
+            return self.export_failed(context, e)
+        
+        context.window_manager.progress_update(self.done)
+        context.scene.threejs_export_status = f"Exporting: {self.done} / {self.total} meshes (Esc to cancel)"
+        if context.area:
+            context.area.tag_redraw()
+        return {'RUNNING_MODAL'}
+    
+    def cancel(self, context):
+        # Blender drops running modal operators when, say, another file is opened
+        self.steps.close()
+        self.end_modal(context)
+    
+    def end_modal(self, context):
+        global modal_export
+        modal_export = None
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        if context.area:
+            context.area.tag_redraw()
+    
+    def export_running(self, context):
+        if modal_export is None:
+            return False
+        self.report({'ERROR'}, "An export is already running, wait for it to finish or press Esc")
+        return True
+    
+    def export_paths(self, context):
+        # Returns (html_path, export_dir), or None after reporting why not
         html_path = context.scene.threejs_html_path
         
         if not html_path:
             self.report({'ERROR'}, "Please specify an HTML file path")
             context.scene.threejs_export_status = "ERROR: No HTML file path specified"
-            return {'CANCELLED'}
+            return None
         
         # export directory
         html_dir = os.path.dirname(html_path)
@@ -59,7 +918,7 @@ class THREEJS_OT_export_scene(Operator):
             except:
                 self.report({'ERROR'}, f"Could not create directory: {html_dir}")
                 context.scene.threejs_export_status = f"ERROR: Could not create directory: {html_dir}"
-                return {'CANCELLED'}
+                return None
         
         # exported_gltfs folder
         export_dir = os.path.join(html_dir, "exported_gltfs")
@@ -68,49 +927,36 @@ class THREEJS_OT_export_scene(Operator):
         except:
             self.report({'ERROR'}, f"Could not create directory: {export_dir}")
             context.scene.threejs_export_status = f"ERROR: Could not create directory: {export_dir}"
-            return {'CANCELLED'}
-        
-        try:
-            # Generate JavaScript and HTML files
-            self.export_threejs(html_path, export_dir)
-            context.scene.threejs_export_status = f"Successfully exported to: {html_path}"
-            self.report({'INFO'}, f"Successfully exported to: {html_path}")
-        except Exception as e:
-            import traceback
-            self.report({'ERROR'}, f"Export error: {str(e)}")
-            context.scene.threejs_export_status = f"ERROR: {str(e)}"
-            print(traceback.format_exc())
-            return {'CANCELLED'}
-            
-        return {'FINISHED'}
+            return None
+        return html_path, export_dir
+    
+    def export_finished(self, context, html_path):
+        context.scene.threejs_export_report = self.profile.summary(context.scene.threejs_report_top)
+        if self.failures:
+            for name, error in self.failures.items():
+                print(f"Warning: could not export '{name}': {error}")
+            context.scene.threejs_export_status = f"Exported to: {html_path} with {len(self.failures)} failed objects ({self.cache.summary()})"
+            self.report({'WARNING'}, f"{len(self.failures)} objects failed to export, see the system console")
+        else:
+            context.scene.threejs_export_status = f"Successfully exported to: {html_path} ({self.cache.summary()})"
+            self.report({'INFO'}, f"Successfully exported to: {html_path} ({self.cache.summary()})")
+    
+    def export_failed(self, context, e):
+        import traceback
+        self.report({'ERROR'}, f"Export error: {str(e)}")
+        context.scene.threejs_export_status = f"ERROR: {str(e)}"
+        print(traceback.format_exc())
+        return {'CANCELLED'}
     
     def safe_name(self, name: str):
-        ACCENT_MAP = {
-        "á": "a", "à": "a", "ã": "a", "â": "a", "ä": "ae", "å": "a",
-        "č": "c", "ć": "c", 
-        "é": "e", "è": "e", "ê": "e", "ë": "e", 
-        "í": "i", "ì": "i", "î": "i", "ï": "i",
-        "ñ": "n",
-        "ó": "o", "ò": "o", "ô": "o", "ö": "oe", "õ": "o", "ø": "o",
-        "ř": "r",
-        "š": "s", "ß": "ss",
-        "ú": "u", "ù": "u", "û": "u", "ü": "ue", "ũ": "u",
-        "ý": "y", "ž": "z"
-        }
-        
-        for accented, plain in ACCENT_MAP.items():
-            name = name.replace(accented, plain)
-            name = name.replace(accented.upper(), plain.upper())
-        name = (
-            name.replace(" ", "_")
-                .replace("-", "_")
-                .replace(".", "_")
-        )
-        return name
+        return self.symbols.name(name)
     
     def safe_transform(self, transform):
         return f"{transform.x}, {transform.z}, {-transform.y}"
     
+    def safe_vector(self, transform):
+        return [transform.x, transform.z, -transform.y]
+    
     def bpy_color_to_hex(self, bpy_color):
         rgb = tuple(int(channel * 255) for channel in bpy_color)
         return '0x{:02x}{:02x}{:02x}'.format(*rgb)
@@ -122,33 +968,728 @@ class THREEJS_OT_export_scene(Operator):
         code += f"{self.safe_name(object.name)}.rotation.set({self.safe_transform(rotation)});\n"
         return code
     
+    def gltf_node_name(self, name: str):
+        # GLTFLoader runs node names through PropertyBinding.sanitizeNodeName
+        return re.sub(r"[\[\]\.:/]", "", re.sub(r"\s", "_", name))
+    
+    def asset_url(self, filepath, html_dir):
+        return os.path.relpath(filepath, html_dir).replace("\\", "/")
+    
+    def gltf_export(self, objs, export_path, count_triangles=None, sidecar=True, **overrides):
+        # Single entry point to the glTF exporter; unchanged assets are served from the cache
+        with self.profile.phase("gltf_export"):
+            start = time.perf_counter()
+            settings = {**self.export_settings(), **overrides}
+            digest = self.cache.digest(objs, settings)
+            hit = self.cache.is_fresh(export_path, digest)
+            if not hit:
+                export_selection(objs, export_path, settings)
+            if sidecar:
+                self.update_bvh(objs, export_path, rebuild=not hit, evaluated=settings.get("export_apply", False))
+            if hit:
+                self.cache.record(export_path, digest, objs, hit=True)
+            else:
+                triangles = count_triangles() if count_triangles else None
+                self.cache.record(export_path, digest, objs, hit=False, triangles=triangles)
+            entry = self.cache.assets[os.path.basename(export_path)]
+            self.profile.record(export_path, time.perf_counter() - start, entry, cached=hit)
+        return export_path
+    
+    def update_bvh(self, objs, export_path, rebuild, evaluated=False):
+        # The sidecar follows its asset: rebuilt with it, restored if missing, removed once switched off
+        bvh_path = export_path + BVH_EXT
+        if not bpy.context.scene.threejs_build_bvh:
+            if os.path.exists(bvh_path):
+                os.remove(bvh_path)
+        elif rebuild or not os.path.exists(bvh_path):
+            with self.profile.phase("bvh"):
+                self.write_bvh(objs, bvh_path, evaluated)
+    
+    def bvh_triangles(self, obj, evaluated):
+        # Y-up positions, [material slot, index within it] per triangle and the slot names, in polygon order
+        obj_eval = obj.evaluated_get(bpy.context.evaluated_depsgraph_get()) if evaluated else None
+        mesh = obj_eval.to_mesh() if evaluated else obj.data
+        mesh.calc_loop_triangles()
+        triangle_count = len(mesh.loop_triangles)
+        corners = array('i', [0]) * (3 * triangle_count)
+        material_indices = array('i', [0]) * triangle_count
+        co = array('f', [0.0]) * (3 * len(mesh.vertices))
+        mesh.loop_triangles.foreach_get("vertices", corners)
+        mesh.loop_triangles.foreach_get("material_index", material_indices)
+        mesh.vertices.foreach_get("co", co)
+        if evaluated:
+            obj_eval.to_mesh_clear()
+        
+        positions = array('f')
+        for vertex in corners:
+            x, y, z = co[vertex * 3:vertex * 3 + 3]
+            positions.extend((x, z, -y))
+        materials = [slot.material.name if slot.material else "" for slot in obj.material_slots] or [""]
+        faces = []
+        per_material = [0] * len(materials)
+        for material_index in material_indices:
+            material_index = min(material_index, len(materials) - 1)
+            faces.append((material_index, per_material[material_index]))
+            per_material[material_index] += 1
+        return positions, faces, materials
+    
+    def write_bvh(self, objs, bvh_path, evaluated):
+        # One BVH per object of the asset, keyed by glTF node name. Layout: magic, header byte length,
+        # JSON header, then for each entry its nodes (6 float32 bounds + 2 uint32), triangle corners
+        # (9 float32) and [material, face index] (2 uint32). Header offsets count from the end of the header.
+        entries = []
+        blocks = []
+        offset = 0
+        for obj in objs:
+            positions, faces, materials = self.bvh_triangles(obj, evaluated)
+            order, nodes = build_bvh(positions)
+            block = b"".join(struct.pack("<6f2I", *node) for node in nodes)
+            block += array('f', (positions[triangle * 9 + value] for triangle in order for value in range(9))).tobytes()
+            block += array('I', (value for triangle in order for value in faces[triangle])).tobytes()
+            entries.append({
+                "node": self.gltf_node_name(obj.name),
+                "materials": materials,
+                "nodes": len(nodes),
+                "triangles": len(order),
+                "offset": offset,
+            })
+            blocks.append(block)
+            offset += len(block)
+        
+        header = json.dumps(entries, separators=(",", ":")).encode()
+        header += b" " * (-len(header) % 4)
+        with open(bvh_path, "wb") as file:
+            file.write(BVH_MAGIC + struct.pack("<I", len(header)) + header)
+            for block in blocks:
+                file.write(block)
+    
+    def blender_path(self, scene):
+        if scene.threejs_blender_path:
+            return bpy.path.abspath(scene.threejs_blender_path)
+        return bpy.app.binary_path
+    
+    def worker_blend_path(self, job_dir):
+        # Workers read the .blend from disk, so unsaved edits go out as a temporary copy
+        if bpy.data.filepath and not bpy.data.is_dirty:
+            return bpy.data.filepath
+        blend_path = os.path.join(job_dir, "scene.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+        return blend_path
+    
+    def export_parallel(self, meshes, export_dir):
+        settings = self.export_settings()
+        pending = []
+        for obj in meshes:
+            export_path = os.path.join(export_dir, f"{self.safe_name(obj.name)}{self.asset_ext()}")
+            digest = self.cache.digest([obj], settings)
+            if self.cache.is_fresh(export_path, digest):
+                self.update_bvh([obj], export_path, rebuild=False)
+                self.cache.record(export_path, digest, [obj], hit=True)
+                self.profile.record(export_path, None, self.cache.assets[os.path.basename(export_path)], cached=True)
+            else:
+                pending.append((obj, export_path, digest))
+        if not pending:
+            return
+        
+        scene = bpy.context.scene
+        shard_size = math.ceil(len(pending) / scene.threejs_worker_count)
+        shards = [
+            [(export_path, [obj.name]) for obj, export_path, _ in shard]
+            for shard in self.chunk_meshes(pending, shard_size)
+        ]
+        with tempfile.TemporaryDirectory(prefix="threejs_export_") as job_dir:
+            results = run_export_workers(
+                self.blender_path(scene), self.worker_blend_path(job_dir), job_dir,
+                shards, settings, scene.threejs_worker_count
+            )
+        
+        for obj, export_path, digest in pending:
+            error = results[export_path]
+            if error is None:
+                self.update_bvh([obj], export_path, rebuild=True)
+                self.cache.record(export_path, digest, [obj], hit=False)
+                self.profile.record(export_path, None, self.cache.assets[os.path.basename(export_path)], cached=False)
+            else:
+                self.failures[obj.name] = error
+    
+    def export_settings(self):
+        scene = bpy.context.scene
+        settings = {"export_format": scene.threejs_export_format}
+        if scene.threejs_share_textures:
+            settings["export_image_format"] = 'NONE'
+        if scene.threejs_export_animation:
+            # Baked tracks replace the exporter's dense per-frame samples
+            settings["export_animations"] = False
+        if scene.threejs_use_draco:
+            settings.update(
+                export_draco_mesh_compression_enable=True,
+                export_draco_mesh_compression_level=scene.threejs_draco_level,
+                export_draco_position_quantization=scene.threejs_position_bits,
+                export_draco_normal_quantization=scene.threejs_normal_bits,
+                export_draco_texcoord_quantization=scene.threejs_texcoord_bits,
+            )
+        return settings
+    
+    def asset_ext(self):
+        return ".glb" if bpy.context.scene.threejs_export_format == 'GLB' else ".gltf"
+    
     def export_obj(self, obj, export_dir):
-        bpy.ops.object.select_all(action='DESELECT')
-
         if obj.type == "MESH":
-            obj.select_set(True)
-            export_path = os.path.join(export_dir, f"{self.safe_name(obj.name)}.gltf")
-            bpy.ops.export_scene.gltf(filepath=export_path, use_selection=True)
-            obj.select_set(False)
-            return export_path
+            export_path = os.path.join(export_dir, f"{self.safe_name(obj.name)}{self.asset_ext()}")
+            return self.gltf_export([obj], export_path)
         return None
     
+    def export_batch(self, objs, export_dir, index):
+        # One exporter pass for a whole chunk of meshes; the loader picks them apart by node name
+        export_path = os.path.join(export_dir, f"batch_{index:03d}{self.asset_ext()}")
+        return self.gltf_export(objs, export_path)
+    
+    def lod_ratios(self, scene):
+        try:
+            ratios = [float(ratio) for ratio in scene.threejs_lod_ratios.split(",") if ratio.strip()]
+        except ValueError:
+            raise ValueError(f"LOD ratios must be comma separated numbers, got '{scene.threejs_lod_ratios}'")
+        if not all(0 < ratio < 1 for ratio in ratios):
+            raise ValueError("LOD ratios must be between 0 and 1")
+        return sorted(set(ratios), reverse=True)
+    
+    def evaluated_triangles(self, obj):
+        if not obj.modifiers:
+            return mesh_triangles(obj.data)
+        obj_eval = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+        triangles = mesh_triangles(obj_eval.to_mesh())
+        obj_eval.to_mesh_clear()
+        return triangles
+    
+    def export_lod_chain(self, obj, export_dir, ratios):
+        # The full mesh plus one decimated asset per ratio, as [(path, distance)] fine to coarse
+        _, radius = self.bounding_sphere(obj)
+        scale = bpy.context.scene.threejs_lod_distance_scale
+        # Every level applies the modifier stack, so LOD0 matches the shape the decimated levels start from
+        export_path = os.path.join(export_dir, f"{self.safe_name(obj.name)}{self.asset_ext()}")
+        self.gltf_export([obj], export_path, count_triangles=lambda: self.evaluated_triangles(obj), export_apply=True)
+        levels = [(export_path, 0.0)]
+        for index, ratio in enumerate(ratios, start=1):
+            # A temporary Decimate modifier is baked in by export_apply; being a modifier,
+            # its ratio also lands in the cache digest
+            modifier = obj.modifiers.new(name="threejs_lod", type='DECIMATE')
+            modifier.ratio = ratio
+            try:
+                export_path = os.path.join(export_dir, f"{self.safe_name(obj.name)}_lod{index}{self.asset_ext()}")
+                self.gltf_export([obj], export_path, count_triangles=lambda: self.evaluated_triangles(obj), export_apply=True)
+            finally:
+                obj.modifiers.remove(modifier)
+            # A level keeping a fraction r of the triangles has roughly sqrt(r) of the edge
+            # density, so it takes over once the object is 1/sqrt(r) times farther away
+            levels.append((export_path, round(radius * scale / math.sqrt(ratio), 3)))
+        return levels
+    
+    def linked_image(self, socket, depth=3):
+        # Follows a shader input back through Normal Map / Separate nodes to its image texture
+        for link in socket.links:
+            node = link.from_node
+            if node.type == 'TEX_IMAGE':
+                return node.image
+            if depth:
+                for node_input in node.inputs:
+                    image = self.linked_image(node_input, depth - 1) if node_input.is_linked else None
+                    if image:
+                        return image
+        return None
+    
+    def texture_size(self, size, scene):
+        if scene.threejs_texture_max_size:
+            size = min(size, scene.threejs_texture_max_size)
+        if scene.threejs_texture_pow2:
+            size = 2 ** int(math.log2(max(size, 1)))
+        return size
+    
+    def export_texture(self, image, texture_dir):
+        # Returns the image's file name in the shared texture directory, or None
+        scene = bpy.context.scene
+        source = image_bytes(image)
+        if source is None:
+            print(f"Warning: image '{image.name}' has no file or packed data, skipping")
+            return None
+        
+        width, height = image.size
+        size = (self.texture_size(width, scene), self.texture_size(height, scene))
+        file_format = 'JPEG' if image.file_format == 'JPEG' else 'PNG'
+        ext = ".jpg" if file_format == 'JPEG' else ".png"
+        # Content addressed: identical images share one file, and settings changes get a new one
+        digest = hashlib.sha1(source + repr((size, scene.threejs_use_ktx2)).encode()).hexdigest()[:16]
+        
+        if scene.threejs_use_ktx2 and os.path.exists(os.path.join(texture_dir, digest + ".ktx2")):
+            return digest + ".ktx2"
+        image_path = os.path.join(texture_dir, digest + ext)
+        if not os.path.exists(image_path):
+            if size == (width, height) and image.file_format == file_format:
+                with open(image_path, "wb") as file:
+                    file.write(source)
+            else:
+                resized = image.copy()
+                try:
+                    resized.scale(*size)
+                    resized.filepath_raw = image_path
+                    resized.file_format = file_format
+                    resized.save()
+                finally:
+                    bpy.data.images.remove(resized)
+        if not scene.threejs_use_ktx2:
+            return digest + ext
+        
+        ktx2_path = os.path.join(texture_dir, digest + ".ktx2")
+        command = [scene.threejs_ktx2_tool, "--t2", "--encode", "etc1s", "--genmipmap", ktx2_path, image_path]
+        try:
+            process = subprocess.run(command, capture_output=True, text=True)
+        except OSError as e:
+            print(f"Warning: could not run '{scene.threejs_ktx2_tool}' ({e}), keeping '{image.name}' as {ext}")
+            return digest + ext
+        if process.returncode != 0:
+            print(f"Warning: KTX2 encoding failed for '{image.name}', keeping it as {ext}: {process.stderr.strip()}")
+            return digest + ext
+        os.remove(image_path)
+        return digest + ".ktx2"
+    
+    def export_textures(self, meshes, html_dir):
+        # Shared, deduplicated textures for every material: {material name: {map slot: url}}
+        texture_dir = os.path.join(html_dir, TEXTURE_DIR)
+        os.makedirs(texture_dir, exist_ok=True)
+        written = {}
+        materials = {}
+        for obj in meshes:
+            for slot in obj.material_slots:
+                material = slot.material
+                if not material or material.name in materials or not (material.use_nodes and material.node_tree):
+                    continue
+                bsdf = next((node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+                if not bsdf:
+                    continue
+                
+                slots = {}
+                for socket_name, map_slot in TEXTURE_SLOTS:
+                    socket = bsdf.inputs.get(socket_name)
+                    image = self.linked_image(socket) if socket else None
+                    if image is None:
+                        continue
+                    if image not in written:
+                        written[image] = self.export_texture(image, texture_dir)
+                    if written[image]:
+                        slots[map_slot] = self.asset_url(os.path.join(texture_dir, written[image]), html_dir)
+                materials[material.name] = slots
+        
+        # Only files this exporter wrote before are ever removed; textures/ may hold the user's own too
+        kept = set(written.values()) - {None}
+        manifest_path = os.path.join(texture_dir, TEXTURE_MANIFEST)
+        try:
+            with open(manifest_path) as file:
+                previous = json.load(file)
+        except (OSError, ValueError):
+            previous = []
+        for filename in previous:
+            stale_path = os.path.join(texture_dir, filename)
+            if filename not in kept and os.path.isfile(stale_path):
+                os.remove(stale_path)
+        with open(manifest_path, "w") as file:
+            json.dump(sorted(kept), file, indent=1)
+        print(f"Shared textures: {len(written)} images referenced, {len(kept)} files written")
+        return {name: slots for name, slots in materials.items() if slots}
+    
+    def group_instances(self, meshes):
+        # Only datablocks shared by two or more objects are worth instancing
+        groups = {}
+        for obj in meshes:
+            if obj not in self.animated:
+                groups.setdefault(obj.data, []).append(obj)
+        return {mesh: objs for mesh, objs in groups.items() if len(objs) > 1}
+    
+    def export_instanced(self, mesh, objs, export_dir):
+        # The first user stands in for the whole group; its node transform is ignored by the loader
+        export_path = os.path.join(export_dir, f"instanced_{self.safe_name(mesh.name)}{self.asset_ext()}")
+        # InstancedMesh raycasts per instance from the geometry, so no BVH sidecar is built
+        return self.gltf_export(objs[:1], export_path, sidecar=False)
+    
+    def threejs_matrix(self, matrix_world):
+        # Blender Z-up world matrix -> three.js Y-up, flattened column-major for Matrix4.fromArray
+        matrix = Y_UP @ matrix_world @ Y_UP.inverted()
+        return [matrix[row][col] for col in range(4) for row in range(4)]
+    
+    def chunk_meshes(self, meshes, batch_size):
+        if batch_size <= 0:
+            return [meshes] if meshes else []
+        return [meshes[i:i + batch_size] for i in range(0, len(meshes), batch_size)]
+    
+    def chunk_batches(self, meshes, batch_size):
+        # GLTFLoader renames nodes whose sanitized names collide within a file ("Tree.Oak" and
+        # "TreeOak" both sanitize to "TreeOak"), so such objects go into different batches
+        batches = []
+        open_batches = []
+        for obj in meshes:
+            node = self.gltf_node_name(obj.name)
+            batch = next((batch for batch in open_batches if node not in batch[1]), None)
+            if batch is None:
+                batch = ([], set())
+                batches.append(batch)
+                open_batches.append(batch)
+            batch[0].append(obj)
+            batch[1].add(node)
+            if 0 < batch_size <= len(batch[0]):
+                open_batches.remove(batch)
+        return [objs for objs, _ in batches]
+    
+    def animated_objects(self):
+        # Meshes, cameras and lights that move: their own action or NLA strips, a driver, a constraint or a moving parent
+        return {
+            obj for obj in bpy.data.objects
+            if obj.type in {"MESH", "CAMERA", "LIGHT"} and not self.is_static(obj)
+        }
+    
+    def bake_animation(self, objs, scene):
+        # World transforms in three.js space on each frame: (times in seconds, {object: {property: flat values}})
+        frames = range(scene.frame_start, scene.frame_end + 1, max(scene.frame_step, 1))
+        fps = scene.render.fps / scene.render.fps_base
+        times = [(frame - scene.frame_start) / fps for frame in frames]
+        samples = {obj: {name: [] for name in TRACK_SIZES} for obj in objs}
+        previous = {}
+        
+        current = scene.frame_current
+        try:
+            for frame in frames:
+                scene.frame_set(frame)
+                for obj in objs:
+                    # Mesh data is converted to Y-up by the glTF exporter; cameras and lights look
+                    # down their local -Z in both programs, so only their world frame is swapped
+                    matrix = Y_UP @ obj.matrix_world
+                    if obj.type == "MESH":
+                        matrix = matrix @ Y_UP.inverted()
+                    location, rotation, scale = matrix.decompose()
+                    # Keep neighbouring quaternions in the same hemisphere so interpolation takes the short way
+                    if obj in previous and rotation.dot(previous[obj]) < 0:
+                        rotation.negate()
+                    previous[obj] = rotation
+                    samples[obj]["position"] += location[:]
+                    samples[obj]["quaternion"] += [rotation.x, rotation.y, rotation.z, rotation.w]
+                    samples[obj]["scale"] += scale[:]
+        finally:
+            scene.frame_set(current)
+        return times, samples
+    
+    def write_animation(self, out, scene, html_dir):
+        # Keyframe tracks packed into one float32 file; each clip lists [property, offset, keys], times then values
+        objs = sorted(self.animated, key=lambda obj: obj.name)
+        times, samples = self.bake_animation(objs, scene)
+        data = array('f')
+        clips = []
+        for obj in objs:
+            tracks = []
+            for name, size in TRACK_SIZES.items():
+                key_times, key_values = reduce_keyframes(times, samples[obj][name], size, scene.threejs_animation_tolerance)
+                tracks.append([name, len(data), len(key_times)])
+                data.extend(key_times)
+                data.extend(key_values)
+            clips.append({"name": self.safe_name(obj.name), "duration": round(times[-1], 6) if times else 0, "tracks": tracks})
+        
+        with open(os.path.join(html_dir, ANIMATION_DATA), "wb") as file:
+            data.tofile(file)
+        keys = sum(track[2] for clip in clips for track in clip["tracks"])
+        print(f"Animation: {len(clips)} objects, {len(times)} frames, {keys} keys after reduction ({len(data) * 4} bytes)")
+        
+        out.write(self.animation_helper() + "\n")
+        if self.manifest:
+            self.manifest.begin("animations")
+            for clip in clips:
+                self.manifest.add(clip)
+        else:
+            out.write(f"loadAnimations({json.dumps(clips, separators=(',', ':'))});\n\n")
+    
+    def is_static(self, obj):
+        # Anything animated, driven or constrained, itself or through a parent, has to stay a separate node
+        while obj:
+            anim = obj.animation_data
+            # NLA strips animate the object even with no active action
+            if (anim and (anim.action or anim.drivers or anim.nla_tracks)) or obj.constraints:
+                return False
+            obj = obj.parent
+        return True
+    
+    def lighting_digest(self, scene):
+        # Everything a bake depends on: rendered geometry, materials and transforms, the lights, the world and the settings
+        hasher = hashlib.sha1(repr((
+            scene.threejs_lightmap_size, scene.threejs_lightmap_samples, scene.threejs_lightmap_atlas_objects, LIGHTMAP_RANGE,
+        )).encode())
+        for obj in sorted(bpy.data.objects, key=lambda obj: obj.name):
+            if obj.hide_render:
+                continue
+            hasher.update(f"{obj.name}:{obj.type}:{[tuple(row) for row in obj.matrix_world]}".encode())
+            if obj.type == "MESH":
+                self.cache.hash_object(hasher, obj)
+            elif obj.type == "LIGHT":
+                hasher.update(rna_fingerprint(obj.data).encode())
+        world = scene.world
+        if world:
+            hasher.update(rna_fingerprint(world).encode())
+            if world.use_nodes and world.node_tree:
+                for node in world.node_tree.nodes:
+                    hasher.update(rna_fingerprint(node).encode())
+                    for socket in node.inputs:
+                        value = getattr(socket, "default_value", None)
+                        if hasattr(value, "__len__") and not isinstance(value, str):
+                            value = tuple(value)
+                        hasher.update(f"{socket.identifier}={value!r}".encode())
+        return hasher.hexdigest()
+    
+    def bake_lightmaps(self, scene, html_dir):
+        # Generator, one atlas per step: fills self.lightmaps with {object name: atlas url}, re-baking only when lighting_digest() changes
+        candidates = []
+        for obj in sorted(bpy.data.objects, key=lambda obj: obj.name):
+            # Linked duplicates share one UV layout, so they cannot have their own atlas regions
+            if obj.type != "MESH" or obj.hide_render or not self.is_static(obj) or obj.data.users > 1:
+                continue
+            # GLTFLoader only reads TEXCOORD_0 and TEXCOORD_1, so the lightmap has to be the second UV map at most
+            if sum(1 for layer in obj.data.uv_layers if layer.name != LIGHTMAP_UV) >= 2:
+                print(f"Warning: '{obj.name}' already has two UV maps, leaving no room for a lightmap; it stays lit in real time")
+                continue
+            if not any(slot.material and slot.material.use_nodes for slot in obj.material_slots):
+                print(f"Warning: '{obj.name}' has no node material to bake its lightmap into, it stays lit in real time")
+                continue
+            candidates.append(obj)
+        if not candidates:
+            return
+        
+        lightmap_dir = os.path.join(html_dir, LIGHTMAP_DIR)
+        os.makedirs(lightmap_dir, exist_ok=True)
+        state_path = os.path.join(lightmap_dir, LIGHTMAP_STATE)
+        try:
+            with open(state_path) as file:
+                previous = json.load(file)
+        except (OSError, ValueError):
+            previous = {}
+        
+        atlases = {
+            f"lightmap_{index:03d}.png": objs
+            for index, objs in enumerate(self.chunk_meshes(candidates, scene.threejs_lightmap_atlas_objects))
+        }
+        state = {
+            "digest": self.lighting_digest(scene),
+            "atlases": {filename: [obj.name for obj in objs] for filename, objs in atlases.items()},
+        }
+        rebake = state != previous or not all(os.path.exists(os.path.join(lightmap_dir, filename)) for filename in atlases)
+        
+        render = scene.render
+        saved = (render.engine, scene.cycles.device, scene.cycles.samples)
+        # CPU Cycles bakes the same with or without a GPU, and in background Blender too
+        render.engine = 'CYCLES'
+        scene.cycles.device = 'CPU'
+        scene.cycles.samples = scene.threejs_lightmap_samples
+        try:
+            for filename, objs in atlases.items():
+                path = os.path.join(lightmap_dir, filename)
+                # The UVs are needed for the export even when the atlas image is reused
+                active_uvs = self.pack_lightmap_uvs(objs, scene.threejs_lightmap_size)
+                try:
+                    if rebake:
+                        self.bake_atlas(objs, path, scene.threejs_lightmap_size)
+                finally:
+                    for obj, name in active_uvs.items():
+                        if name:
+                            obj.data.uv_layers.active = obj.data.uv_layers[name]
+                url = self.asset_url(path, html_dir)
+                for obj in objs:
+                    self.lightmaps[obj.name] = url
+                yield len(objs)
+        finally:
+            render.engine, scene.cycles.device, scene.cycles.samples = saved
+        
+        # Only atlases this exporter baked before are ever removed
+        for filename in previous.get("atlases", {}):
+            stale_path = os.path.join(lightmap_dir, filename)
+            if filename not in atlases and os.path.isfile(stale_path):
+                os.remove(stale_path)
+        with open(state_path, "w") as file:
+            json.dump(state, file, indent=1)
+        print(f"Lightmaps: {len(atlases)} atlases for {len(candidates)} objects" + ("" if rebake else ", unchanged since the last bake"))
+    
+    def pack_lightmap_uvs(self, objs, size):
+        # Packs the objects into one atlas on an active LIGHTMAP_UV layer; returns {object: previously active layer name}
+        active_uvs = {}
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in objs:
+            uv_layers = obj.data.uv_layers
+            active_uvs[obj] = uv_layers.active.name if uv_layers.active else None
+            # Noted before the layer exists, so a failed pack or bake still takes it off again
+            self.lightmap_uvs.append(obj)
+            uv_layers.active = uv_layers.get(LIGHTMAP_UV) or uv_layers.new(name=LIGHTMAP_UV)
+            obj.select_set(True)
+        bpy.context.view_layer.objects.active = objs[0]
+        bpy.ops.uv.lightmap_pack(PREF_CONTEXT='ALL_FACES', PREF_PACK_IN_ONE=True, PREF_NEW_UVLAYER=False, PREF_IMG_PX_SIZE=size)
+        return active_uvs
+    
+    def bake_atlas(self, objs, path, size):
+        # Cycles bakes into the active Image Texture node of every material on the selected objects
+        image = bpy.data.images.new(os.path.basename(path), size, size, float_buffer=True)
+        image.colorspace_settings.name = 'Non-Color'
+        targets = []
+        for material in {slot.material for obj in objs for slot in obj.material_slots if slot.material and slot.material.use_nodes}:
+            nodes = material.node_tree.nodes
+            node = nodes.new('ShaderNodeTexImage')
+            node.image = image
+            targets.append((nodes, node, nodes.active))
+            nodes.active = node
+        try:
+            bpy.ops.object.bake(type='DIFFUSE', pass_filter={'DIRECT', 'INDIRECT'}, margin=LIGHTMAP_MARGIN, use_clear=True)
+            pixels = array('f', bytes(4 * len(image.pixels)))
+            image.pixels.foreach_get(pixels)
+            image.pixels.foreach_set(array('f', (value / LIGHTMAP_RANGE for value in pixels)))
+            image.filepath_raw = path
+            image.file_format = 'PNG'
+            image.save()
+        finally:
+            for nodes, node, active in targets:
+                nodes.remove(node)
+                nodes.active = active
+            bpy.data.images.remove(image)
+            for obj in objs:
+                obj.select_set(False)
+    
+    def remove_lightmap_uvs(self):
+        for obj in self.lightmap_uvs:
+            layer = obj.data.uv_layers.get(LIGHTMAP_UV)
+            if layer:
+                obj.data.uv_layers.remove(layer)
+        self.lightmap_uvs = []
+    
+    def lightmap_helper(self):
+        # Node names as GLTFLoader sanitizes them, since the table is read before any renaming
+        table = {self.gltf_node_name(name): url for name, url in self.lightmaps.items()}
+        helper = "// Baked lighting: lightmapped meshes become unlit and show their atlas, so real-time lights skip them\n"
+        helper += f"const lightmaps = {json.dumps(table, separators=(',', ':'))};\n"
+        helper += "const lightmapLoader = new THREE.TextureLoader();\n"
+        helper += "const lightmapAtlases = {};\n"
+        helper += "function loadLightmap(url) {\n"
+        helper += "\tif (!lightmapAtlases[url]) {\n"
+        helper += "\t\tlightmapAtlases[url] = lightmapLoader.load(url);\n"
+        helper += "\t\tlightmapAtlases[url].flipY = false; // glTF UV convention\n"
+        helper += "\t}\n"
+        helper += "\treturn lightmapAtlases[url];\n"
+        helper += "}\n"
+        helper += "function bakedMaterial(material, lightMap) {\n"
+        helper += "\treturn new THREE.MeshBasicMaterial({\n"
+        helper += "\t\tname: material.name,\n"
+        helper += "\t\tcolor: material.color,\n"
+        helper += "\t\tmap: material.map,\n"
+        helper += "\t\talphaMap: material.alphaMap,\n"
+        helper += "\t\ttransparent: material.transparent,\n"
+        helper += "\t\topacity: material.opacity,\n"
+        helper += "\t\tside: material.side,\n"
+        helper += "\t\tlightMap,\n"
+        helper += f"\t\tlightMapIntensity: {LIGHTMAP_RANGE},\n"
+        helper += "\t});\n"
+        helper += "}\n"
+        helper += "const loadUnbaked = loader.load.bind(loader);\n"
+        helper += "loader.load = (url, onLoad, onProgress, onError) => {\n"
+        helper += "\tloadUnbaked(url, (gltf) => {\n"
+        helper += "\t\tgltf.scene.traverse((node) => {\n"
+        helper += "\t\t\tconst atlas = lightmaps[node.name];\n"
+        helper += "\t\t\tif (!atlas) return;\n"
+        helper += "\t\t\tnode.traverse((child) => {\n"
+        helper += "\t\t\t\tif (!child.isMesh) return;\n"
+        helper += "\t\t\t\tconst lightMap = loadLightmap(atlas);\n"
+        helper += "\t\t\t\t// Without a UV map of its own the lightmap UVs are the mesh's first set\n"
+        helper += "\t\t\t\tif (!child.geometry.attributes.uv2) child.geometry.setAttribute('uv2', child.geometry.attributes.uv);\n"
+        helper += "\t\t\t\tchild.material = Array.isArray(child.material)\n"
+        helper += "\t\t\t\t\t? child.material.map((material) => bakedMaterial(material, lightMap))\n"
+        helper += "\t\t\t\t\t: bakedMaterial(child.material, lightMap);\n"
+        helper += "\t\t\t});\n"
+        helper += "\t\t});\n"
+        helper += "\t\tonLoad(gltf);\n"
+        helper += "\t}, onProgress, onError);\n"
+        helper += "};\n"
+        return helper
+    
+    def static_groups(self, meshes, chunk_size):
+        # Groups of two or more static meshes that share material slots and a grid cell
+        groups = {}
+        for obj in meshes:
+            # A merged chunk could span several lightmap atlases, so baked objects stay on their own
+            if not self.is_static(obj) or obj.name in self.lightmaps:
+                continue
+            key = tuple(slot.material.name if slot.material else "" for slot in obj.material_slots)
+            if chunk_size > 0:
+                center, _ = self.bounding_sphere(obj)
+                key += tuple(math.floor(value / chunk_size) for value in center)
+            groups.setdefault(key, []).append(obj)
+        return [objs for objs in groups.values() if len(objs) > 1]
+    
+    def merge_static(self, objs, name):
+        # One temporary world-space object for the group, and {material: [[object name, first triangle], ...]}
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        slot_names = [slot.material.name if slot.material else "" for slot in objs[0].material_slots] or [""]
+        merged_bm = bmesh.new()
+        table = {}
+        offsets = {}
+        for obj in objs:
+            obj_eval = obj.evaluated_get(depsgraph)
+            mesh = obj_eval.to_mesh()
+            mesh.transform(obj.matrix_world)
+            
+            loop_totals = array('i', [0]) * len(mesh.polygons)
+            material_indices = array('i', [0]) * len(mesh.polygons)
+            mesh.polygons.foreach_get("loop_total", loop_totals)
+            mesh.polygons.foreach_get("material_index", material_indices)
+            triangles = {}
+            for loop_total, material_index in zip(loop_totals, material_indices):
+                material = slot_names[min(material_index, len(slot_names) - 1)]
+                triangles[material] = triangles.get(material, 0) + loop_total - 2
+            for material, count in triangles.items():
+                table.setdefault(material, []).append([obj.name, offsets.get(material, 0)])
+                offsets[material] = offsets.get(material, 0) + count
+            
+            merged_bm.from_mesh(mesh)
+            obj_eval.to_mesh_clear()
+        
+        merged = bpy.data.meshes.new(name)
+        merged_bm.to_mesh(merged)
+        merged_bm.free()
+        for slot in objs[0].material_slots:
+            merged.materials.append(slot.material)
+        batch = bpy.data.objects.new(name, merged)
+        bpy.context.scene.collection.objects.link(batch)
+        return batch, table
+    
+    def export_static(self, objs, export_dir, index):
+        name = f"static_{index:03d}"
+        batch, table = self.merge_static(objs, name)
+        merged = batch.data
+        try:
+            export_path = os.path.join(export_dir, f"{name}{self.asset_ext()}")
+            self.gltf_export([batch], export_path)
+        finally:
+            bpy.data.objects.remove(batch)
+            bpy.data.meshes.remove(merged)
+        return export_path, table
+    
     def generate_html(self, html_path, js_path):
         # Create a basic HTML file that imports the script.js file
-        html_content = """<!DOCTYPE html>
+        import_map = ""
+        if self.library != 'CDN':
+            # Only script.js needs it; a bundle has no bare imports left, but the map keeps the
+            # page working if the bundle is deleted and the script pointed back at script.js
+            import_map = f"""
+    <script type="importmap">{{ "imports": {{ "three/": "./{VENDOR_DIR}/" }} }}</script>"""
+        html_content = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Three.js Blender Scene</title>
     <style>
-        body { margin: 0; overflow: hidden; }
-        canvas { display: block; }
-    </style>
+        body {{ margin: 0; overflow: hidden; }}
+        canvas {{ display: block; }}
+    </style>{import_map}
 </head>
 <body>
     <!-- Import the three.js script -->
-    <script type="module" src="script.js"></script>
+    <script type="module" src="{os.path.basename(js_path)}"></script>
 </body>
 </html>
 """
@@ -156,14 +1697,16 @@ class THREEJS_OT_export_scene(Operator):
         with open(html_path, "w") as file:
             file.write(html_content)
     
-    def loader(self, object):
+    def loader(self, object, url):
         location = object.location
         rotation = object.rotation_euler
         obj_name = self.safe_name(object.name)
 
-        load_code = f"loader.load('exported_gltfs/{obj_name}.glb',\n"
+        load_code = f"loader.load('{url}',\n"
         load_code += "\t(gltf) => {\n"
-        load_code += f"\t\tconst {obj_name} = gltf.scene;\n"
+        # The glTF node carries the transform it was exported with, so it is placed rather than its wrapper
+        load_code += f"\t\tconst {obj_name} = gltf.scene.getObjectByName({json.dumps(self.gltf_node_name(object.name))});\n"
+        load_code += f"\t\t{obj_name}.name = '{obj_name}';\n"
         load_code += f"\t\t{obj_name}.position.set({self.safe_transform(location)});\n"
         load_code += f"\t\t{obj_name}.rotation.set({self.safe_transform(rotation)});\n"
         load_code += f"\t\tscene.add({obj_name});\n"
@@ -177,158 +1720,1236 @@ class THREEJS_OT_export_scene(Operator):
         load_code += ");\n"
         return load_code
     
-    def export_threejs(self, html_path, export_dir):
-        # Imports for Three.js
-        imports = 'import * as THREE from "https://cdn.skypack.dev/three@0.129.0/build/three.module.js";\n'
-        imports += 'import { OrbitControls } from "https://cdn.skypack.dev/three@0.129.0/examples/jsm/controls/OrbitControls.js";\n'
-        imports += 'import { GLTFLoader } from "https://cdn.skypack.dev/three@0.129.0/examples/jsm/loaders/GLTFLoader.js";\n\n'
+    def batch_loader(self, objs, url):
+        batch_name = self.safe_name(os.path.splitext(os.path.basename(url))[0])
+
+        load_code = f"loader.load('{url}',\n"
+        load_code += "\t(gltf) => {\n"
+        for obj in objs:
+            obj_name = self.safe_name(obj.name)
+            load_code += f"\t\tconst {obj_name} = gltf.scene.getObjectByName({json.dumps(self.gltf_node_name(obj.name))});\n"
+            load_code += f"\t\t{obj_name}.name = '{obj_name}';\n"
+            load_code += f"\t\t{obj_name}.position.set({self.safe_transform(obj.location)});\n"
+            load_code += f"\t\t{obj_name}.rotation.set({self.safe_transform(obj.rotation_euler)});\n"
+            load_code += f"\t\tscene.add({obj_name});\n"
+            if obj in self.animated:
+                load_code += f"\t\tanimateObject('{obj_name}', {obj_name});\n"
+        load_code += "\t},\n"
+        load_code += "\t(xhr) => {\n"
+        load_code += f"\t\tconsole.log('{batch_name} loaded: ' + (xhr.loaded / xhr.total * 100) + '%');\n"
+        load_code += "\t},\n"
+        load_code += "\t(error) => {\n"
+        load_code += f"\t\tconsole.error('An error happened loading the batch {batch_name}', error);\n"
+        load_code += "\t}\n"
+        load_code += ");\n"
+        return load_code
+    
+    def instancing_helper(self):
+        helper = "// Builds one InstancedMesh per primitive of a loaded glTF from packed 4x4 matrices\n"
+        helper += "function addInstances(gltf, name, matrices) {\n"
+        helper += "\tconst count = matrices.length / 16;\n"
+        helper += "\tconst matrix = new THREE.Matrix4();\n"
+        helper += "\tgltf.scene.traverse((child) => {\n"
+        helper += "\t\tif (!child.isMesh) return;\n"
+        helper += "\t\tconst instances = new THREE.InstancedMesh(child.geometry, child.material, count);\n"
+        helper += "\t\tinstances.name = name;\n"
+        helper += "\t\tinstances.frustumCulled = false; // bounds only cover the source geometry\n"
+        helper += "\t\tinstances.castShadow = child.castShadow;\n"
+        helper += "\t\tinstances.receiveShadow = child.receiveShadow;\n"
+        helper += "\t\tfor (let i = 0; i < count; i++) {\n"
+        helper += "\t\t\tinstances.setMatrixAt(i, matrix.fromArray(matrices, i * 16));\n"
+        helper += "\t\t}\n"
+        helper += "\t\tscene.add(instances);\n"
+        helper += "\t});\n"
+        helper += "}\n"
+        return helper
+    
+    def lod_helper(self):
+        helper = "// LOD chains: the coarsest level loads first, finer ones once the camera is close enough to show them\n"
+        helper += "const lodChains = [];\n"
+        helper += "function addLodChain(name, node, position, rotation, levels) {\n"
+        helper += "\tconst lod = new THREE.LOD();\n"
+        helper += "\tlod.name = name;\n"
+        helper += "\tlod.position.fromArray(position);\n"
+        helper += "\tlod.rotation.fromArray(rotation);\n"
+        helper += "\tscene.add(lod);\n"
+        helper += "\tlodChains.push({ lod, node, levels, next: levels.length - 1, loading: false });\n"
+        helper += "}\n\n"
+        helper += "function updateLodChains(camera) {\n"
+        helper += "\tfor (const chain of lodChains) {\n"
+        helper += "\t\tif (chain.loading || chain.next < 0) continue;\n"
+        helper += "\t\tconst upper = chain.next + 1 < chain.levels.length ? chain.levels[chain.next + 1][1] : Infinity;\n"
+        helper += "\t\tif (camera.position.distanceTo(chain.lod.position) >= upper) continue;\n"
+        helper += "\t\tconst [url, distance] = chain.levels[chain.next];\n"
+        helper += "\t\tchain.loading = true;\n"
+        helper += "\t\tloader.load(url,\n"
+        helper += "\t\t\t(gltf) => {\n"
+        helper += "\t\t\t\t// The LOD carries the object transform, so the level keeps only its scale\n"
+        helper += "\t\t\t\tconst level = gltf.scene.getObjectByName(chain.node) || gltf.scene;\n"
+        helper += "\t\t\t\tlevel.position.set(0, 0, 0);\n"
+        helper += "\t\t\t\tlevel.rotation.set(0, 0, 0);\n"
+        helper += "\t\t\t\tchain.lod.addLevel(level, distance);\n"
+        helper += "\t\t\t\tchain.next--;\n"
+        helper += "\t\t\t\tchain.loading = false;\n"
+        helper += "\t\t\t},\n"
+        helper += "\t\t\tundefined,\n"
+        helper += "\t\t\t(error) => console.error(`An error happened loading ${url}`, error)\n"
+        helper += "\t\t);\n"
+        helper += "\t}\n"
+        helper += "}\n"
+        return helper
+    
+    def static_helper(self):
+        helper = "// Static batches: merged meshes map triangle runs back to their source objects, for picking\n"
+        helper += "function addStaticBatch(gltf, name, table) {\n"
+        helper += "\tgltf.scene.name = name;\n"
+        helper += "\tgltf.scene.traverse((child) => {\n"
+        helper += "\t\tif (child.isMesh) child.userData.staticObjects = table[child.material.name] || table[''];\n"
+        helper += "\t});\n"
+        helper += "\tscene.add(gltf.scene);\n"
+        helper += "}\n\n"
+        helper += "// Name of the source object under a Raycaster hit on a static batch, or null\n"
+        helper += "function staticObjectName(hit) {\n"
+        helper += "\tconst runs = hit.object.userData.staticObjects;\n"
+        helper += "\tif (!runs) return null;\n"
+        helper += "\tlet low = 0;\n"
+        helper += "\tlet high = runs.length - 1;\n"
+        helper += "\twhile (low < high) {\n"
+        helper += "\t\tconst mid = (low + high + 1) >> 1;\n"
+        helper += "\t\tif (runs[mid][1] <= hit.faceIndex) low = mid;\n"
+        helper += "\t\telse high = mid - 1;\n"
+        helper += "\t}\n"
+        helper += "\treturn runs[low][0];\n"
+        helper += "}\n"
+        return helper
+    
+    def animation_helper(self):
+        helper = "// ANIMATION\n"
+        helper += "// Baked clips play through one AnimationMixer, each bound to its object as soon as both are loaded\n"
+        helper += "const mixer = new THREE.AnimationMixer(scene);\n"
+        helper += "const clock = new THREE.Clock();\n"
+        helper += "const animationClips = {};\n"
+        helper += "const animationTargets = {};\n"
+        helper += "const trackTypes = { position: THREE.VectorKeyframeTrack, quaternion: THREE.QuaternionKeyframeTrack, scale: THREE.VectorKeyframeTrack };\n"
+        helper += "function playAnimation(name) {\n"
+        helper += "\tif (animationClips[name] && animationTargets[name]) {\n"
+        helper += "\t\tmixer.clipAction(animationClips[name], animationTargets[name]).play();\n"
+        helper += "\t}\n"
+        helper += "}\n\n"
+        helper += "function animateObject(name, object) {\n"
+        helper += "\tanimationTargets[name] = object;\n"
+        helper += "\tplayAnimation(name);\n"
+        helper += "}\n\n"
+        helper += "function loadAnimations(clips) {\n"
+        helper += f"\tfetch('{ANIMATION_DATA}').then((response) => response.arrayBuffer()).then((buffer) => {{\n"
+        helper += "\t\tconst data = new Float32Array(buffer);\n"
+        helper += "\t\tfor (const clip of clips) {\n"
+        helper += "\t\t\t// Tracks are views into the one buffer; '.position' binds to the action's root object\n"
+        helper += "\t\t\tconst tracks = clip.tracks.map(([property, offset, keys]) => {\n"
+        helper += "\t\t\t\tconst size = property === 'quaternion' ? 4 : 3;\n"
+        helper += "\t\t\t\tconst times = data.subarray(offset, offset + keys);\n"
+        helper += "\t\t\t\tconst values = data.subarray(offset + keys, offset + keys * (1 + size));\n"
+        helper += "\t\t\t\treturn new trackTypes[property]('.' + property, times, values);\n"
+        helper += "\t\t\t});\n"
+        helper += "\t\t\tanimationClips[clip.name] = new THREE.AnimationClip(clip.name, clip.duration, tracks);\n"
+        helper += "\t\t\tplayAnimation(clip.name);\n"
+        helper += "\t\t}\n"
+        helper += "\t});\n"
+        helper += "}\n"
+        return helper
+    
+    def bvh_helper(self):
+        # Nodes are looked up before onLoad, which may move them out of gltf.scene
+        helper = "// BVH sidecars: raycasts walk a prebuilt hierarchy instead of testing every triangle\n"
+        helper += "const bvhBox = new THREE.Box3();\n"
+        helper += "const bvhRay = new THREE.Ray();\n"
+        helper += "const bvhInverse = new THREE.Matrix4();\n"
+        helper += "const bvhCorners = [new THREE.Vector3(), new THREE.Vector3(), new THREE.Vector3()];\n"
+        helper += "const bvhPoint = new THREE.Vector3();\n"
+        helper += "function raycastBvh(node, bvh, raycaster, intersects) {\n"
+        helper += "\tbvhRay.copy(raycaster.ray).applyMatrix4(bvhInverse.copy(node.matrixWorld).invert());\n"
+        helper += "\tconst stack = [0];\n"
+        helper += "\twhile (stack.length) {\n"
+        helper += "\t\tconst index = stack.pop();\n"
+        helper += "\t\tbvhBox.min.fromArray(bvh.bounds, index * 8);\n"
+        helper += "\t\tbvhBox.max.fromArray(bvh.bounds, index * 8 + 3);\n"
+        helper += "\t\tif (!bvhRay.intersectsBox(bvhBox)) continue;\n"
+        helper += "\t\tconst offset = bvh.links[index * 8 + 6];\n"
+        helper += "\t\tconst count = bvh.links[index * 8 + 7];\n"
+        helper += "\t\tif (count === 0) {\n"
+        helper += "\t\t\tstack.push(offset, index + 1);\n"
+        helper += "\t\t\tcontinue;\n"
+        helper += "\t\t}\n"
+        helper += "\t\tfor (let triangle = offset; triangle < offset + count; triangle++) {\n"
+        helper += "\t\t\tfor (let corner = 0; corner < 3; corner++) bvhCorners[corner].fromArray(bvh.positions, triangle * 9 + corner * 3);\n"
+        helper += "\t\t\tif (!bvhRay.intersectTriangle(bvhCorners[0], bvhCorners[1], bvhCorners[2], false, bvhPoint)) continue;\n"
+        helper += "\t\t\tconst point = bvhPoint.clone().applyMatrix4(node.matrixWorld);\n"
+        helper += "\t\t\tconst distance = raycaster.ray.origin.distanceTo(point);\n"
+        helper += "\t\t\tif (distance < raycaster.near || distance > raycaster.far) continue;\n"
+        helper += "\t\t\tconst [material, faceIndex] = bvh.faces.subarray(triangle * 2, triangle * 2 + 2);\n"
+        helper += "\t\t\tintersects.push({ distance, point, object: bvh.meshes[material], faceIndex });\n"
+        helper += "\t\t}\n"
+        helper += "\t}\n"
+        helper += "}\n\n"
+        helper += "function attachBvh(buffer, nodes) {\n"
+        helper += "\tconst headerLength = new Uint32Array(buffer, 4, 1)[0];\n"
+        helper += "\tconst header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));\n"
+        helper += "\tfor (const entry of header) {\n"
+        helper += "\t\tconst node = nodes[entry.node];\n"
+        helper += "\t\tif (!node) continue;\n"
+        helper += "\t\tconst start = 8 + headerLength + entry.offset;\n"
+        helper += "\t\tconst positionStart = start + entry.nodes * 32;\n"
+        helper += "\t\tconst faceStart = positionStart + entry.triangles * 36;\n"
+        helper += "\t\tconst meshes = [];\n"
+        helper += "\t\tnode.traverse((child) => {\n"
+        helper += "\t\t\tif (!child.isMesh) return;\n"
+        helper += "\t\t\tmeshes.push(child);\n"
+        helper += "\t\t\tchild.raycast = () => {};\n"
+        helper += "\t\t});\n"
+        helper += "\t\tconst bvh = {\n"
+        helper += "\t\t\tbounds: new Float32Array(buffer, start, entry.nodes * 8),\n"
+        helper += "\t\t\tlinks: new Uint32Array(buffer, start, entry.nodes * 8),\n"
+        helper += "\t\t\tpositions: new Float32Array(buffer, positionStart, entry.triangles * 9),\n"
+        helper += "\t\t\tfaces: new Uint32Array(buffer, faceStart, entry.triangles * 2),\n"
+        helper += "\t\t\t// Hits report the primitive mesh and face index a brute-force raycast would\n"
+        helper += "\t\t\tmeshes: entry.materials.map((name) => meshes.find((mesh) => mesh.material.name === name) || meshes[0] || node),\n"
+        helper += "\t\t};\n"
+        helper += "\t\tnode.raycast = (raycaster, intersects) => raycastBvh(node, bvh, raycaster, intersects);\n"
+        helper += "\t}\n"
+        helper += "}\n\n"
+        helper += "const loadWithoutBvh = loader.load.bind(loader);\n"
+        helper += "loader.load = (url, onLoad, onProgress, onError) => {\n"
+        helper += "\tloadWithoutBvh(url, (gltf) => {\n"
+        helper += "\t\tconst nodes = {};\n"
+        helper += "\t\tgltf.scene.traverse((child) => { nodes[child.name] = child; });\n"
+        helper += f"\t\tfetch(url + '{BVH_EXT}')\n"
+        helper += "\t\t\t.then((response) => (response.ok ? response.arrayBuffer() : null))\n"
+        helper += "\t\t\t.then((buffer) => buffer && attachBvh(buffer, nodes));\n"
+        helper += "\t\tonLoad(gltf);\n"
+        helper += "\t}, onProgress, onError);\n"
+        helper += "};\n"
+        return helper
+    
+    def lod_loader(self, obj, levels):
+        level_code = ",\n".join(f"\t['{url}', {distance}]" for url, distance in levels)
+        load_code = f"addLodChain({json.dumps(self.safe_name(obj.name))}, {json.dumps(self.gltf_node_name(obj.name))}, "
+        load_code += f"[{self.safe_transform(obj.location)}], [{self.safe_transform(obj.rotation_euler)}], [\n"
+        load_code += level_code + "\n"
+        load_code += "]);\n"
+        return load_code
+    
+    def instanced_loader(self, mesh, objs, url):
+        mesh_name = self.safe_name(mesh.name)
+        matrices = ", ".join(f"{value:.6g}" for obj in objs for value in self.threejs_matrix(obj.matrix_world))
+
+        load_code = f"loader.load('{url}',\n"
+        load_code += "\t(gltf) => {\n"
+        load_code += f"\t\taddInstances(gltf, '{mesh_name}', new Float32Array([{matrices}]));\n"
+        load_code += "\t},\n"
+        load_code += "\t(xhr) => {\n"
+        load_code += f"\t\tconsole.log('{mesh_name} loaded: ' + (xhr.loaded / xhr.total * 100) + '%');\n"
+        load_code += "\t},\n"
+        load_code += "\t(error) => {\n"
+        load_code += f"\t\tconsole.error('An error happened loading the instanced model {mesh_name}', error);\n"
+        load_code += "\t}\n"
+        load_code += ");\n"
+        return load_code
+    
+    def static_loader(self, name, url, table):
+        load_code = f"loader.load('{url}',\n"
+        load_code += "\t(gltf) => {\n"
+        load_code += f"\t\taddStaticBatch(gltf, '{name}', {json.dumps(table)});\n"
+        load_code += "\t},\n"
+        load_code += "\t(xhr) => {\n"
+        load_code += f"\t\tconsole.log('{name} loaded: ' + (xhr.loaded / xhr.total * 100) + '%');\n"
+        load_code += "\t},\n"
+        load_code += "\t(error) => {\n"
+        load_code += f"\t\tconsole.error('An error happened loading the static batch {name}', error);\n"
+        load_code += "\t}\n"
+        load_code += ");\n"
+        return load_code
+    
+    def loader_setup(self, scene):
+        setup_code = "const loader = new GLTFLoader();\n"
+        if scene.threejs_use_draco:
+            setup_code += "const dracoLoader = new DRACOLoader();\n"
+            setup_code += f"dracoLoader.setDecoderPath('{self.three_url(DRACO_DECODER)}');\n"
+            setup_code += "loader.setDRACOLoader(dracoLoader);\n"
+        if scene.threejs_log_asset_stats:
+            # Payload size comes from the last progress event; decoding is everything after it
+            setup_code += "\n// Per-asset payload size and decode time\n"
+            setup_code += "const loadAsset = loader.load.bind(loader);\n"
+            setup_code += "loader.load = (url, onLoad, onProgress, onError) => {\n"
+            setup_code += "\tlet bytes = 0;\n"
+            setup_code += "\tlet fetched = performance.now();\n"
+            setup_code += "\tloadAsset(url, (gltf) => {\n"
+            setup_code += "\t\tconsole.log(`${url}: ${bytes} bytes, decoded in ${(performance.now() - fetched).toFixed(1)} ms`);\n"
+            setup_code += "\t\tonLoad(gltf);\n"
+            setup_code += "\t}, (xhr) => {\n"
+            setup_code += "\t\tbytes = xhr.loaded;\n"
+            setup_code += "\t\tfetched = performance.now();\n"
+            setup_code += "\t\tif (onProgress) onProgress(xhr);\n"
+            setup_code += "\t}, onError);\n"
+            setup_code += "};\n"
+        if scene.threejs_share_textures:
+            # glTFs are exported without images; materials pick up the shared files by name
+            setup_code += "\n// Shared textures: each file is fetched once and reused by every material that references it\n"
+            setup_code += "const textureLoader = new THREE.TextureLoader();\n"
+            if scene.threejs_use_ktx2:
+                setup_code += "const ktx2Loader = new KTX2Loader();\n"
+                setup_code += f"ktx2Loader.setTranscoderPath('{self.three_url(BASIS_TRANSCODER)}');\n"
+            setup_code += "const sharedTextures = {};\n"
+            setup_code += "const materialTextures = {};\n"
+            setup_code += "function loadSharedTexture(url, slot) {\n"
+            setup_code += "\tif (!sharedTextures[url]) {\n"
+            if scene.threejs_use_ktx2:
+                setup_code += "\t\tconst texture = (url.endsWith('.ktx2') ? ktx2Loader : textureLoader).load(url);\n"
+            else:
+                setup_code += "\t\tconst texture = textureLoader.load(url);\n"
+            setup_code += "\t\ttexture.flipY = false; // glTF UV convention\n"
+            setup_code += "\t\tif (slot === 'map' || slot === 'emissiveMap') texture.encoding = THREE.sRGBEncoding;\n"
+            setup_code += "\t\tsharedTextures[url] = texture;\n"
+            setup_code += "\t}\n"
+            setup_code += "\treturn sharedTextures[url];\n"
+            setup_code += "}\n"
+            setup_code += "const loadUntextured = loader.load.bind(loader);\n"
+            setup_code += "loader.load = (url, onLoad, onProgress, onError) => {\n"
+            setup_code += "\tloadUntextured(url, (gltf) => {\n"
+            setup_code += "\t\tgltf.scene.traverse((child) => {\n"
+            setup_code += "\t\t\tif (!child.isMesh) return;\n"
+            setup_code += "\t\t\tfor (const material of Array.isArray(child.material) ? child.material : [child.material]) {\n"
+            setup_code += "\t\t\t\tfor (const [slot, textureUrl] of Object.entries(materialTextures[material.name] || {})) {\n"
+            setup_code += "\t\t\t\t\tmaterial[slot] = loadSharedTexture(textureUrl, slot);\n"
+            setup_code += "\t\t\t\t\tif (slot === 'emissiveMap') material.emissive.set(0xffffff);\n"
+            setup_code += "\t\t\t\t\tmaterial.needsUpdate = true;\n"
+            setup_code += "\t\t\t\t}\n"
+            setup_code += "\t\t\t}\n"
+            setup_code += "\t\t});\n"
+            setup_code += "\t\tonLoad(gltf);\n"
+            setup_code += "\t}, onProgress, onError);\n"
+            setup_code += "};\n"
+        if self.lightmaps:
+            setup_code += "\n" + self.lightmap_helper()
+        if self.draws_shadows(scene):
+            setup_code += "\n// Shadows: every loaded mesh casts and receives them\n"
+            setup_code += "const loadUnshadowed = loader.load.bind(loader);\n"
+            setup_code += "loader.load = (url, onLoad, onProgress, onError) => {\n"
+            setup_code += "\tloadUnshadowed(url, (gltf) => {\n"
+            setup_code += "\t\tgltf.scene.traverse((child) => {\n"
+            setup_code += "\t\t\tif (child.isMesh) child.castShadow = child.receiveShadow = true;\n"
+            setup_code += "\t\t});\n"
+            setup_code += "\t\tonLoad(gltf);\n"
+            setup_code += "\t}, onProgress, onError);\n"
+            setup_code += "};\n"
+        if scene.threejs_build_bvh:
+            setup_code += "\n" + self.bvh_helper()
+        if scene.threejs_progressive_loading:
+            # Loads are issued nearest-first, so a FIFO with a concurrency cap keeps that order
+            setup_code += f"\n// Progressive loading: nearest assets first, at most {scene.threejs_max_concurrent_loads} requests at a time\n"
+            setup_code += "const queuedLoad = loader.load.bind(loader);\n"
+            setup_code += "const loadQueue = [];\n"
+            setup_code += "let nextLoad = 0;\n"
+            setup_code += "let activeLoads = 0;\n"
+            setup_code += "let finishedLoads = 0;\n"
+            setup_code += "function pumpLoadQueue() {\n"
+            setup_code += f"\twhile (activeLoads < {scene.threejs_max_concurrent_loads} && nextLoad < loadQueue.length) {{\n"
+            setup_code += "\t\tconst [url, onLoad, onError] = loadQueue[nextLoad];\n"
+            setup_code += "\t\tloadQueue[nextLoad++] = null;\n"
+            setup_code += "\t\tactiveLoads++;\n"
+            setup_code += "\t\tconst finish = () => {\n"
+            setup_code += "\t\t\tactiveLoads--;\n"
+            setup_code += "\t\t\tfinishedLoads++;\n"
+            setup_code += "\t\t\tconsole.log(`Loaded ${finishedLoads} / ${loadQueue.length} assets`);\n"
+            setup_code += "\t\t\twindow.dispatchEvent(new CustomEvent('threejs-load-progress', { detail: { loaded: finishedLoads, total: loadQueue.length } }));\n"
+            setup_code += "\t\t\tpumpLoadQueue();\n"
+            setup_code += "\t\t};\n"
+            setup_code += "\t\tqueuedLoad(url, (gltf) => {\n"
+            setup_code += "\t\t\tfinish();\n"
+            setup_code += "\t\t\tonLoad(gltf);\n"
+            setup_code += "\t\t}, undefined, (error) => {\n"
+            setup_code += "\t\t\tfinish();\n"
+            setup_code += "\t\t\tif (onError) onError(error);\n"
+            setup_code += "\t\t});\n"
+            setup_code += "\t}\n"
+            setup_code += "}\n"
+            setup_code += "loader.load = (url, onLoad, onProgress, onError) => {\n"
+            setup_code += "\tloadQueue.push([url, onLoad, onError]);\n"
+            setup_code += "\tpumpLoadQueue();\n"
+            setup_code += "};\n"
+        return setup_code
+    
+    def active_camera(self):
+        # The camera the generated page renders through
+        for cam in bpy.data.cameras:
+            cam_obj = self.symbols.get(cam.name)
+            if cam_obj:
+                return cam_obj
+        return None
+    
+    def bounding_sphere(self, obj):
+        corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+        center = sum(corners, Vector()) / len(corners)
+        radius = max((corner - center).length for corner in corners)
+        return center, radius
+    
+    def load_priorities(self, meshes):
+        # Distance from the camera to each bounding sphere's surface; smaller loads sooner
+        camera_obj = self.active_camera()
+        # Without a scene camera the page falls back to (0, 0, 5) in three.js space
+        eye = camera_obj.matrix_world.translation if camera_obj else Vector((0, -5, 0))
+        priorities = {}
+        for obj in meshes:
+            center, radius = self.bounding_sphere(obj)
+            priorities[obj] = max((center - eye).length - radius, 0.0)
+        return priorities
+    
+    def three_modules(self, scene):
+        # (import clause, path inside the three.js package) for every module the page imports
+        modules = [
+            ("* as THREE", "build/three.module.js"),
+            ("{ OrbitControls }", "examples/jsm/controls/OrbitControls.js"),
+            ("{ GLTFLoader }", "examples/jsm/loaders/GLTFLoader.js"),
+        ]
+        if scene.threejs_share_textures and scene.threejs_use_ktx2:
+            modules.append(("{ KTX2Loader }", "examples/jsm/loaders/KTX2Loader.js"))
+        if scene.threejs_use_draco:
+            modules.append(("{ DRACOLoader }", "examples/jsm/loaders/DRACOLoader.js"))
+        return modules
+    
+    def three_url(self, path):
+        # Decoder folders are fetched at runtime, relative to the page once vendored
+        return THREE_UNPKG + path if self.library == 'CDN' else f"{VENDOR_DIR}/{path}"
+    
+    def vendor_library(self, scene, html_dir):
+        # Copies the three.js files the page uses next to it; returns the source that took effect
+        paths = [path for _, path in self.three_modules(scene)]
+        if scene.threejs_use_draco:
+            paths += [DRACO_DECODER + name for name in ("draco_decoder.js", "draco_decoder.wasm", "draco_wasm_wrapper.js")]
+        if scene.threejs_share_textures and scene.threejs_use_ktx2:
+            paths += [BASIS_TRANSCODER + name for name in ("basis_transcoder.js", "basis_transcoder.wasm")]
+        
+        source = bpy.path.abspath(scene.threejs_three_path) if scene.threejs_three_path else THREE_UNPKG
+        try:
+            fetched = vendor_three(source, os.path.join(html_dir, *VENDOR_DIR.split("/")), paths)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not vendor three.js from '{source}' ({e}), the page loads it from the CDN")
+            return 'CDN'
+        if fetched:
+            print(f"Vendored {fetched} three.js files from {source}")
+        return scene.threejs_library_source
+    
+    def bundle_script(self, scene, html_dir, js_path):
+        # esbuild bundle of script.js and the vendored modules; None when esbuild is missing or fails
+        bundle_path = os.path.join(html_dir, BUNDLE_JS)
+        # Bare three/... imports resolve against the vendored package, like the import map does
+        env = dict(os.environ, NODE_PATH=os.path.dirname(os.path.join(html_dir, *VENDOR_DIR.split("/"))))
+        command = [scene.threejs_bundler, js_path, "--bundle", "--minify", "--format=esm", "--log-level=error", f"--outfile={bundle_path}"]
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, env=env)
+        except OSError as e:
+            print(f"Warning: could not run '{scene.threejs_bundler}' ({e}), the page loads the vendored modules instead")
+            process = None
+        if process is None or process.returncode != 0:
+            if process is not None:
+                print(f"Warning: bundling failed, the page loads the vendored modules instead: {process.stderr.strip()}")
+            # A stale bundle from an earlier export would not match the new script.js
+            if os.path.exists(bundle_path):
+                os.remove(bundle_path)
+            return None
+        return bundle_path
+    
+    def write_imports(self, out, scene):
+        prefix = THREE_CDN if self.library == 'CDN' else "three/"
+        for clause, path in self.three_modules(scene):
+            out.write(f'import {clause} from "{prefix}{path}";\n')
+        out.write("\n")
         
         # Scene initialization
-        scene_init = "// Initialize the scene\n"
-        scene_init += "const scene = new THREE.Scene();\n\n"
+        out.write("// Initialize the scene\n")
+        out.write("const scene = new THREE.Scene();\n\n")
+    
+    def write_cameras(self, out):
+        out.write("// CAMERAS\n")
+        if self.manifest:
+            # The runtime copies the first manifest camera onto this one
+            out.write("const camera = new THREE.PerspectiveCamera(75, window.innerWidth / window.innerHeight, 0.1, 1000);\n")
+            out.write("camera.position.set(0, 0, 5);\n")
+            out.write("scene.add(camera);\n\n")
+            self.manifest.begin("cameras")
         
-        # CAMERAS
-        cam_code = "// CAMERAS\n"
         for camera in bpy.data.cameras:
             cam_name = self.safe_name(camera.name)
-            cam_obj = bpy.data.objects.get(camera.name)
+            cam_obj = self.symbols.get(camera.name)
             if not cam_obj:
                 continue
+            
+            if self.manifest:
+                self.manifest.add({
+                    "name": cam_name,
+                    "fov": camera.lens,
+                    "position": self.safe_vector(cam_obj.location),
+                    "rotation": self.safe_vector(cam_obj.rotation_euler),
+                })
+                continue
                 
-            cam_code += f"// {cam_name}\n"
-            cam_code += f"const {cam_name} = new THREE.PerspectiveCamera({camera.lens}, window.innerWidth / window.innerHeight, 0.1, 1000);\n"
-            cam_code += f"{cam_name}.position.set({self.safe_transform(cam_obj.location)});\n"
-            cam_code += f"{cam_name}.rotation.set({self.safe_transform(cam_obj.rotation_euler)});\n"
-            cam_code += f"console.log('Camera {cam_name} position:', {cam_name}.position);\n"
-            cam_code += f"scene.add({cam_name});\n\n"
-        
-        # LIGHTS
-        light_code = "// LIGHTS\n"
+            out.write(f"// {cam_name}\n")
+            out.write(f"const {cam_name} = new THREE.PerspectiveCamera({camera.lens}, window.innerWidth / window.innerHeight, 0.1, 1000);\n")
+            out.write(f"{cam_name}.name = '{cam_name}';\n")
+            out.write(f"{cam_name}.position.set({self.safe_transform(cam_obj.location)});\n")
+            out.write(f"{cam_name}.rotation.set({self.safe_transform(cam_obj.rotation_euler)});\n")
+            out.write(f"console.log('Camera {cam_name} position:', {cam_name}.position);\n")
+            out.write(f"scene.add({cam_name});\n")
+            if cam_obj in self.animated:
+                out.write(f"animateObject('{cam_name}', {cam_name});\n")
+            out.write("\n")
+    
+    def light_params(self, light, light_obj):
+        params = {
+            "name": self.safe_name(light.name),
+            "type": light.type,
+            "color": int(self.bpy_color_to_hex(light.color), 16),
+        }
+        
+        # POINT LIGHT
+        if light.type == "POINT":
+            params["position"] = self.safe_vector(light_obj.location)
+
+        # SPOT LIGHT
+        elif light.type == "SPOT":
+            params["energy"] = light.energy
+            params["distance"] = light.cutoff_distance
+            params["angle"] = light_obj.data.spot_size
+            
+            location = light_obj.location
+            
+            # Determining target location based on constraints
+            if light_obj.constraints:
+                for constraint in light_obj.constraints:
+                    if constraint.type in {'TRACK_TO', 'DAMPED_TRACK', 'LOCKED_TRACK'} and constraint.target:
+                        target_location = constraint.target.location
+                        break
+            else:
+                # Calculate the target position if no constraint
+                target_location = location + light_obj.rotation_euler.to_matrix() @ Vector((0, 0, -1))
+            
+            params["target"] = self.safe_vector(target_location)
+
+        # AREA LIGHT
+        elif light.type == "AREA":
+            params["energy"] = light.energy
+        
+        else:
+            return None
+        
+        profile = RENDERER_PROFILES[bpy.context.scene.threejs_renderer_profile]
+        if light.threejs_cast_shadow and profile["shadow_type"]:
+            params["shadow"] = profile["shadow_size"]
+        return params
+    
+    def draws_shadows(self, scene):
+        # Whether the renderer profile has shadows and at least one light opted in
+        if not RENDERER_PROFILES[scene.threejs_renderer_profile]["shadow_type"] or self.lights_baked:
+            return False
+        return any(light.threejs_cast_shadow for light in bpy.data.lights)
+    
+    def light_code(self, params):
+        light_name = params["name"]
+        color = f"0x{params['color']:06x}"
+        
+        if params["type"] == "POINT":
+            light_code = f"const {light_name} = new THREE.PointLight({color});\n"
+            light_code += f"{light_name}.position.set({', '.join(map(str, params['position']))});\n"
+        elif params["type"] == "SPOT":
+            light_code = f"const {light_name} = new THREE.SpotLight({color}, {params['energy']}, {params['distance']}, {params['angle']}, 0, 1);\n"
+            light_code += f"{light_name}.target.position.set({', '.join(map(str, params['target']))});\n"
+        else:
+            light_code = f"const {light_name} = new THREE.DirectionalLight({color}, {params['energy']});\n"
+        
+        light_code += f"{light_name}.name = '{light_name}';\n"
+        if params.get("shadow"):
+            light_code += f"{light_name}.castShadow = true;\n"
+            light_code += f"{light_name}.shadow.mapSize.set({params['shadow']}, {params['shadow']});\n"
+        light_code += f"scene.add({light_name});\n\n"
+        return light_code
+    
+    def write_lights(self, out):
+        out.write("// LIGHTS\n")
+        if self.manifest:
+            self.manifest.begin("lights")
+        if self.lights_baked:
+            # Every mesh shows baked lighting, so real-time lights would have nothing left to light
+            out.write("// baked into lightmaps\n\n")
+            return
+        
         for light in bpy.data.lights:
-            light_name = self.safe_name(light.name)
-            light_obj = bpy.data.objects.get(light.name)
+            light_obj = self.symbols.get(light.name)
             if not light_obj:
                 continue
-                
+            
             try:
-                # POINT LIGHT
-                if light.type == "POINT":
-                    light_code += f"const {light_name} = new THREE.PointLight({self.bpy_color_to_hex(light.color)});\n"
-                    light_code += f"{light_name}.position.set({self.safe_transform(light_obj.location)});\n"
-
-                # SPOT LIGHT
-                elif light.type == "SPOT":
-                    spot_size = light_obj.data.spot_size
-                    light_code += f"const {light_name} = new THREE.SpotLight({self.bpy_color_to_hex(light.color)}, {light.energy}, {light.cutoff_distance}, {spot_size}, 0, 1);\n"
-                    light_code += f"{light_name}.castShadow = true; // enable shadow\n"
-                    
-                    location = light_obj.location
-                    
-                    # Determining target location based on constraints
-                    if light_obj.constraints:
-                        for constraint in light_obj.constraints:
-                            if constraint.type in {'TRACK_TO', 'DAMPED_TRACK', 'LOCKED_TRACK'} and constraint.target:
-                                target_location = constraint.target.location
-                                break
-                    else:
-                        # Calculate the target position if no constraint
-                        target_location = location + light_obj.rotation_euler.to_matrix() @ Vector((0, 0, -1))
-                    
-                    light_code += f"{light_name}.target.position.set({self.safe_transform(target_location)});\n"
-
-                # AREA LIGHT
-                elif light.type == "AREA":
-                    light_code += f"const {light_name} = new THREE.DirectionalLight({self.bpy_color_to_hex(light.color)}, {light.energy});\n"
-                
-                light_code += f"scene.add({light_name});\n\n"
+                params = self.light_params(light, light_obj)
             except Exception as e:
                 print(f"Warning with light '{light.name}': {str(e)}")
                 continue
-        
-        # OBJECTS
-        obj_code = "// OBJECTS\n"
+            if params is None:
+                continue
+            
+            if self.manifest:
+                self.manifest.add(params)
+            else:
+                out.write(self.light_code(params))
+                if light_obj in self.animated:
+                    out.write(f"animateObject('{params['name']}', {params['name']});\n\n")
+    
+    def emit_object(self, out, obj, url):
+        if obj in self.animated:
+            # batch_loader() also hooks the node up to its baked tracks
+            return self.emit_batch(out, [obj], url)
+        if self.manifest:
+            self.manifest.add({
+                "url": url,
+                "name": self.safe_name(obj.name),
+                "node": self.gltf_node_name(obj.name),
+                "position": self.safe_vector(obj.location),
+                "rotation": self.safe_vector(obj.rotation_euler),
+            })
+        else:
+            out.write(self.loader(obj, url) + "\n")
+    
+    def emit_batch(self, out, objs, url):
+        if self.manifest:
+            self.manifest.add({
+                "url": url,
+                "nodes": [
+                    {
+                        "name": self.safe_name(obj.name),
+                        "node": self.gltf_node_name(obj.name),
+                        "position": self.safe_vector(obj.location),
+                        "rotation": self.safe_vector(obj.rotation_euler),
+                    }
+                    for obj in objs
+                ],
+            })
+        else:
+            out.write(self.batch_loader(objs, url) + "\n")
+    
+    def emit_lod(self, out, obj, levels):
+        if self.manifest:
+            self.manifest.add({
+                "name": self.safe_name(obj.name),
+                "node": self.gltf_node_name(obj.name),
+                "position": self.safe_vector(obj.location),
+                "rotation": self.safe_vector(obj.rotation_euler),
+                "lod": [[url, distance] for url, distance in levels],
+            })
+        else:
+            out.write(self.lod_loader(obj, levels) + "\n")
+    
+    def emit_instanced(self, out, mesh, objs, url):
+        if self.manifest:
+            self.manifest.add({
+                "url": url,
+                "name": self.safe_name(mesh.name),
+                "instances": [round(value, 6) for obj in objs for value in self.threejs_matrix(obj.matrix_world)],
+            })
+        else:
+            out.write(self.instanced_loader(mesh, objs, url) + "\n")
+    
+    def emit_static(self, out, url, table):
+        name = os.path.splitext(os.path.basename(url))[0]
+        if self.manifest:
+            self.manifest.add({"url": url, "name": name, "static": table})
+        else:
+            out.write(self.static_loader(name, url, table) + "\n")
+    
+    def write_objects(self, out, scene, html_dir, export_dir):
+        # Generator: yields the number of meshes handled after each exported asset
+        out.write("// OBJECTS\n")
+        # Code comments per object would defeat the point of a constant-size manifest runtime
+        comment = (lambda text: None) if self.manifest else (lambda text: out.write(f"// {text}\n"))
         
         # Check if GLTFLoader is needed
         has_meshes = any(obj.type == "MESH" for obj in bpy.data.objects)
-        if has_meshes:
-            obj_code += "const loader = new GLTFLoader();\n\n"
+        if has_meshes or self.manifest:
+            out.write(self.loader_setup(scene) + "\n")
+        if self.manifest:
+            out.write(self.instancing_helper() + "\n")
+            if scene.threejs_use_lod:
+                out.write(self.lod_helper() + "\n")
+            if scene.threejs_static_batching:
+                out.write(self.static_helper() + "\n")
+            self.manifest.begin("assets")
         
-        for obj in bpy.data.objects:
-            if obj.type == "MESH":
+        meshes = [obj for obj in bpy.data.objects if obj.type == "MESH"]
+        materials = {}
+        if scene.threejs_share_textures:
+            with self.profile.phase("textures"):
+                materials = self.export_textures(meshes, html_dir)
+        if scene.threejs_progressive_loading:
+            # Exporting nearest-first makes every later stage (groups, batches, emitted loads) nearest-first too
+            priorities = self.load_priorities(meshes)
+            meshes.sort(key=priorities.__getitem__)
+        
+        # Linked duplicates: one asset per shared mesh datablock, drawn as an InstancedMesh
+        if scene.threejs_use_instancing:
+            groups = self.group_instances(meshes)
+            if groups and not self.manifest:
+                out.write(self.instancing_helper() + "\n")
+            for mesh, objs in groups.items():
+                comment(f"{self.safe_name(mesh.name)} ({len(objs)} instances)")
+                filepath = self.export_instanced(mesh, objs, export_dir)
+                self.emit_instanced(out, mesh, objs, self.asset_url(filepath, html_dir))
+                yield len(objs)
+            instanced = {obj for objs in groups.values() for obj in objs}
+            meshes = [obj for obj in meshes if obj not in instanced]
+        
+        # Heavy meshes become THREE.LOD chains; light ones are not worth the extra requests
+        if scene.threejs_use_lod:
+            ratios = self.lod_ratios(scene)
+            lod_meshes = [
+                obj for obj in meshes
+                if obj not in self.animated and self.evaluated_triangles(obj) >= scene.threejs_lod_min_triangles
+            ]
+            if lod_meshes and not self.manifest:
+                out.write(self.lod_helper() + "\n")
+            for obj in lod_meshes:
+                comment(f"{self.safe_name(obj.name)} ({len(ratios) + 1} LOD levels)")
+                levels = self.export_lod_chain(obj, export_dir, ratios)
+                stats = [self.cache.assets[os.path.basename(path)] for path, _ in levels]
+                print(f"LOD '{obj.name}': " + ", ".join(f"{entry['triangles']} triangles / {entry['bytes']} bytes" for entry in stats))
+                self.emit_lod(out, obj, [(self.asset_url(path, html_dir), distance) for path, distance in levels])
+                yield 1
+            meshes = [obj for obj in meshes if obj not in set(lod_meshes)]
+        
+        # Static props sharing materials become one merged asset per grid cell: one draw call each
+        if scene.threejs_static_batching:
+            static_groups = self.static_groups(meshes, scene.threejs_static_chunk_size)
+            if static_groups and not self.manifest:
+                out.write(self.static_helper() + "\n")
+            for index, objs in enumerate(static_groups):
+                comment(f"static batch {index}: {len(objs)} objects")
+                filepath, table = self.export_static(objs, export_dir, index)
+                self.emit_static(out, self.asset_url(filepath, html_dir), table)
+                yield len(objs)
+            batched = {obj for objs in static_groups for obj in objs}
+            meshes = [obj for obj in meshes if obj not in batched]
+        
+        if scene.threejs_export_mode == 'PARALLEL':
+            with self.profile.phase("gltf_export"):
+                self.export_parallel(meshes, export_dir)
+            yield len(meshes)
+            for obj in meshes:
                 obj_name = self.safe_name(obj.name)
-                obj_code += f"// {obj_name}\n"
+                comment(obj_name)
+                if obj.name in self.failures:
+                    comment(f"export failed: {self.failures[obj.name].splitlines()[0]}\n")
+                    continue
+                filepath = os.path.join(export_dir, f"{obj_name}{self.asset_ext()}")
+                self.emit_object(out, obj, self.asset_url(filepath, html_dir))
+        elif scene.threejs_export_mode == 'BATCHED':
+            for index, batch in enumerate(self.chunk_batches(meshes, scene.threejs_batch_size)):
+                comment(f"batch {index}: {', '.join(self.safe_name(obj.name) for obj in batch)}")
+                filepath = self.export_batch(batch, export_dir, index)
+                self.emit_batch(out, batch, self.asset_url(filepath, html_dir))
+                yield len(batch)
+        else:
+            for obj in meshes:
+                comment(self.safe_name(obj.name))
                 filepath = self.export_obj(obj, export_dir)
                 if filepath:
-                    obj_code += self.loader(obj) + "\n"
+                    self.emit_object(out, obj, self.asset_url(filepath, html_dir))
+                yield 1
+        
+        with self.profile.phase("file_writes"):
+            self.cache.prune(export_dir)
+            self.cache.save()
+        
+        if scene.threejs_share_textures:
+            if self.manifest:
+                self.manifest.begin("materials")
+                for name, slots in materials.items():
+                    self.manifest.add({"name": name, "slots": slots})
+            elif materials:
+                out.write("// Material texture slots\n")
+                out.write(f"Object.assign(materialTextures, {json.dumps(materials, indent=1)});\n\n")
         
-        # RENDERER
-        renderer_code = "// RENDERER\n"
-        renderer_code += "const renderer = new THREE.WebGLRenderer();\n"
-        renderer_code += "renderer.setSize(window.innerWidth, window.innerHeight);\n"
-        renderer_code += "document.body.appendChild(renderer.domElement);\n"
+        if self.manifest:
+            out.write(self.manifest_runtime(scene) + "\n")
+    
+    def manifest_runtime(self, scene):
+        # Fixed-size loop that builds the whole scene from scene.json
+        runtime = "// Scene manifest runtime\n"
+        runtime += "const lightTypes = {\n"
+        runtime += "\tPOINT: (params) => new THREE.PointLight(params.color),\n"
+        runtime += "\tSPOT: (params) => new THREE.SpotLight(params.color, params.energy, params.distance, params.angle, 0, 1),\n"
+        runtime += "\tAREA: (params) => new THREE.DirectionalLight(params.color, params.energy),\n"
+        runtime += "};\n\n"
+        runtime += "function placeNode(node, params) {\n"
+        runtime += "\tnode.name = params.name;\n"
+        runtime += "\tnode.position.fromArray(params.position);\n"
+        runtime += "\tnode.rotation.fromArray(params.rotation);\n"
+        runtime += "\tscene.add(node);\n"
+        if scene.threejs_export_animation:
+            runtime += "\tanimateObject(params.name, node);\n"
+        runtime += "}\n\n"
+        runtime += f"fetch('{SCENE_MANIFEST}').then((response) => response.json()).then((manifest) => {{\n"
+        if scene.threejs_export_animation:
+            runtime += "\tloadAnimations(manifest.animations);\n\n"
+        runtime += "\tmanifest.cameras.forEach((params, index) => {\n"
+        runtime += "\t\tconst instance = index === 0 ? camera : new THREE.PerspectiveCamera(params.fov, window.innerWidth / window.innerHeight, 0.1, 1000);\n"
+        runtime += "\t\tinstance.fov = params.fov;\n"
+        runtime += "\t\tinstance.updateProjectionMatrix();\n"
+        runtime += "\t\tplaceNode(instance, params);\n"
+        runtime += "\t});\n\n"
+        runtime += "\tfor (const params of manifest.lights) {\n"
+        runtime += "\t\tconst light = lightTypes[params.type](params);\n"
+        runtime += "\t\tlight.name = params.name;\n"
+        runtime += "\t\tif (params.position) light.position.fromArray(params.position);\n"
+        runtime += "\t\tif (params.target) light.target.position.fromArray(params.target);\n"
+        runtime += "\t\tif (params.shadow) {\n"
+        runtime += "\t\t\tlight.castShadow = true;\n"
+        runtime += "\t\t\tlight.shadow.mapSize.set(params.shadow, params.shadow);\n"
+        runtime += "\t\t}\n"
+        runtime += "\t\tscene.add(light);\n"
+        if scene.threejs_export_animation:
+            runtime += "\t\tanimateObject(params.name, light);\n"
+        runtime += "\t}\n\n"
+        if not scene.threejs_progressive_loading:
+            runtime += "\tlet loaded = 0;\n"
+        if scene.threejs_share_textures:
+            runtime += "\tfor (const entry of manifest.materials) materialTextures[entry.name] = entry.slots;\n\n"
+        runtime += "\tfor (const asset of manifest.assets) {\n"
+        if scene.threejs_use_lod:
+            runtime += "\t\tif (asset.lod) {\n"
+            runtime += "\t\t\taddLodChain(asset.name, asset.node, asset.position, asset.rotation, asset.lod);\n"
+            runtime += "\t\t\tcontinue;\n"
+            runtime += "\t\t}\n"
+        runtime += "\t\tloader.load(asset.url,\n"
+        runtime += "\t\t\t(gltf) => {\n"
+        runtime += "\t\t\t\tif (asset.static) {\n"
+        runtime += "\t\t\t\t\taddStaticBatch(gltf, asset.name, asset.static);\n"
+        runtime += "\t\t\t\t} else if (asset.instances) {\n"
+        runtime += "\t\t\t\t\taddInstances(gltf, asset.name, new Float32Array(asset.instances));\n"
+        runtime += "\t\t\t\t} else if (asset.nodes) {\n"
+        runtime += "\t\t\t\t\tfor (const params of asset.nodes) placeNode(gltf.scene.getObjectByName(params.node), params);\n"
+        runtime += "\t\t\t\t} else {\n"
+        runtime += "\t\t\t\t\tplaceNode(gltf.scene.getObjectByName(asset.node), asset);\n"
+        runtime += "\t\t\t\t}\n"
+        if not scene.threejs_progressive_loading:
+            runtime += "\t\t\t\tconsole.log(`Loaded ${++loaded} / ${manifest.assets.length} assets`);\n"
+        runtime += "\t\t\t},\n"
+        runtime += "\t\t\tundefined,\n"
+        runtime += "\t\t\t(error) => console.error(`An error happened loading ${asset.url}`, error)\n"
+        runtime += "\t\t);\n"
+        runtime += "\t}\n"
+        if self.renders_on_demand(scene):
+            runtime += "\trequestRender(); // cameras and lights are in place\n"
+        runtime += "});\n"
+        return runtime
+    
+    def renders_on_demand(self, scene):
+        # The animation mixer needs every frame, so baked animation keeps the continuous loop
+        return RENDERER_PROFILES[scene.threejs_renderer_profile]["on_demand"] and not scene.threejs_export_animation
+    
+    def write_renderer(self, out, scene, camera_used=None):
+        profile = RENDERER_PROFILES[scene.threejs_renderer_profile]
+        on_demand = self.renders_on_demand(scene)
+        antialias = "true" if profile["antialias"] else "false"
+        
+        out.write("// RENDERER\n")
+        out.write(f"const renderer = new THREE.WebGLRenderer({{ antialias: {antialias}, powerPreference: '{profile['power']}' }});\n")
+        out.write(f"renderer.setPixelRatio(Math.min(window.devicePixelRatio, {profile['pixel_ratio']}));\n")
+        out.write("renderer.setSize(window.innerWidth, window.innerHeight);\n")
+        if self.draws_shadows(scene):
+            out.write("renderer.shadowMap.enabled = true;\n")
+            out.write(f"renderer.shadowMap.type = THREE.{profile['shadow_type']};\n")
+        out.write("document.body.appendChild(renderer.domElement);\n")
+        if scene.threejs_share_textures and scene.threejs_use_ktx2:
+            out.write("ktx2Loader.detectSupport(renderer);\n")
         
         # Background color
-        background_color = bpy.context.scene.world.color if hasattr(bpy.context.scene, 'world') and bpy.context.scene.world else (0, 0, 0)
-        renderer_code += f"\n// Background Color\n"
-        renderer_code += f"scene.background = new THREE.Color({self.bpy_color_to_hex(background_color)});\n"
+        background_color = scene.world.color if scene.world else (0, 0, 0)
+        out.write(f"\n// Background Color\n")
+        out.write(f"scene.background = new THREE.Color({self.bpy_color_to_hex(background_color)});\n")
         
         # Find a camera to use
-        camera_used = None
-        if bpy.data.cameras:
-            for cam in bpy.data.cameras:
-                if bpy.data.objects.get(cam.name):
-                    camera_used = self.safe_name(cam.name)
-                    break
+        if not camera_used and self.active_camera():
+            camera_used = self.safe_name(self.active_camera().name)
         
         if not camera_used:
             # Add a default camera if none exists
-            renderer_code += "\n// Default Camera (since no camera was found in the scene)\n"
-            renderer_code += "const camera = new THREE.PerspectiveCamera(75, window.innerWidth / window.innerHeight, 0.1, 1000);\n"
-            renderer_code += "camera.position.set(0, 0, 5);\n"
-            renderer_code += "scene.add(camera);\n"
+            out.write("\n// Default Camera (since no camera was found in the scene)\n")
+            out.write("const camera = new THREE.PerspectiveCamera(75, window.innerWidth / window.innerHeight, 0.1, 1000);\n")
+            out.write("camera.position.set(0, 0, 5);\n")
+            out.write("scene.add(camera);\n")
             camera_used = "camera"
         
         # Event listeners
-        renderer_code += "\n// Event Listeners\n"
-        renderer_code += "window.addEventListener('resize', () => {\n"
-        renderer_code += f"\t{camera_used}.aspect = window.innerWidth / window.innerHeight;\n"
-        renderer_code += f"\t{camera_used}.updateProjectionMatrix();\n"
-        renderer_code += "\trenderer.setSize(window.innerWidth, window.innerHeight);\n"
-        renderer_code += "});\n"
+        out.write("\n// Event Listeners\n")
+        out.write("window.addEventListener('resize', () => {\n")
+        out.write(f"\t{camera_used}.aspect = window.innerWidth / window.innerHeight;\n")
+        out.write(f"\t{camera_used}.updateProjectionMatrix();\n")
+        out.write("\trenderer.setSize(window.innerWidth, window.innerHeight);\n")
+        if on_demand:
+            out.write("\trequestRender();\n")
+        out.write("});\n")
         
         # Orbit Controls
-        renderer_code += "\n// OrbitControls\n"
-        renderer_code += f"const controls = new OrbitControls({camera_used}, renderer.domElement);\n"
-        renderer_code += "controls.enableDamping = true;\n"
-        renderer_code += "controls.dampingFactor = 0.05;\n"
+        out.write("\n// OrbitControls\n")
+        out.write(f"const controls = new OrbitControls({camera_used}, renderer.domElement);\n")
+        out.write("controls.enableDamping = true;\n")
+        out.write("controls.dampingFactor = 0.05;\n")
+        
+        if on_demand:
+            # OrbitControls fires 'change' on every update that moves the camera, damping included,
+            # and the default loading manager reports each finished glTF, texture and Draco file
+            out.write("\n// Render on demand: a frame is drawn only when the camera moves, the window resizes or a load finishes\n")
+            out.write("let renderRequested = false;\n")
+            out.write("function render() {\n")
+            out.write("\trenderRequested = false;\n")
+            if scene.threejs_use_lod:
+                out.write(f"\tupdateLodChains({camera_used});\n")
+            out.write("\tcontrols.update(); // requests another frame while damping settles\n")
+            out.write(f"\trenderer.render(scene, {camera_used});\n")
+            out.write("}\n")
+            out.write("function requestRender() {\n")
+            out.write("\tif (renderRequested) return;\n")
+            out.write("\trenderRequested = true;\n")
+            out.write("\trequestAnimationFrame(render);\n")
+            out.write("}\n")
+            out.write("controls.addEventListener('change', requestRender);\n")
+            out.write("THREE.DefaultLoadingManager.onProgress = requestRender;\n\n")
+            out.write("render();\n")
+            return
         
         # Animation loop
-        renderer_code += "\n// Animation loop\n"
-        renderer_code += "function animate() {\n"
-        renderer_code += "\trequestAnimationFrame(animate);\n"
-        renderer_code += "\tcontrols.update(); // for damping\n"
-        renderer_code += f"\trenderer.render(scene, {camera_used});\n"
-        renderer_code += "}\n\n"
-        renderer_code += "animate();\n"
-        
-        # Combine
-                # Combine all code
-        js_content = imports + scene_init + cam_code + light_code + obj_code + renderer_code
-        
-        # Save the JavaScript to a separate file
-        js_path = os.path.join(os.path.dirname(html_path), "script.js")
-        with open(js_path, "w") as file:
-            file.write(js_content)
-        
-        # Generate and save the HTML file
-        self.generate_html(html_path, js_path)
-        
-        # Also save three.js in the same folder as the HTML file
-        three_js_path = os.path.join(os.path.dirname(html_path), "three.js")
-        with open(three_js_path, "w") as file:
-            file.write(js_content)
-            
+        out.write("\n// Animation loop\n")
+        out.write("function animate() {\n")
+        out.write("\trequestAnimationFrame(animate);\n")
+        if scene.threejs_export_animation:
+            out.write("\tmixer.update(clock.getDelta());\n")
+        if scene.threejs_use_lod:
+            out.write(f"\tupdateLodChains({camera_used});\n")
+        out.write("\tcontrols.update(); // for damping\n")
+        out.write(f"\trenderer.render(scene, {camera_used});\n")
+        out.write("}\n\n")
+        out.write("animate();\n")
+    
+    def live_client(self, scene):
+        client = "\n// Live link: transforms, light, camera and mesh changes pushed by Blender while it runs\n"
+        client += "function applyLiveDelta(delta) {\n"
+        client += "\tfor (const [name, params] of Object.entries(delta.nodes || {})) {\n"
+        client += "\t\tconst node = scene.getObjectByName(name);\n"
+        client += "\t\tif (!node) continue;\n"
+        client += "\t\tnode.position.fromArray(params.position);\n"
+        client += "\t\tnode.rotation.fromArray(params.rotation);\n"
+        client += "\t}\n"
+        client += "\tfor (const [name, params] of Object.entries(delta.lights || {})) {\n"
+        client += "\t\tconst light = scene.getObjectByName(name);\n"
+        client += "\t\tif (!light) continue;\n"
+        client += "\t\tlight.color.setHex(params.color);\n"
+        client += "\t\tif (params.position) light.position.fromArray(params.position);\n"
+        client += "\t\tif (params.energy !== undefined) light.intensity = params.energy;\n"
+        client += "\t\tif (params.distance !== undefined) light.distance = params.distance;\n"
+        client += "\t\tif (params.angle !== undefined) light.angle = params.angle;\n"
+        client += "\t\tif (params.target) {\n"
+        client += "\t\t\tlight.target.position.fromArray(params.target);\n"
+        client += "\t\t\tlight.target.updateMatrixWorld(); // the target is not part of the scene graph\n"
+        client += "\t\t}\n"
+        client += "\t}\n"
+        client += "\tfor (const [name, params] of Object.entries(delta.cameras || {})) {\n"
+        client += "\t\tconst camera = scene.getObjectByName(name);\n"
+        client += "\t\tif (!camera) continue;\n"
+        client += "\t\tcamera.fov = params.fov;\n"
+        client += "\t\tcamera.updateProjectionMatrix();\n"
+        client += "\t}\n"
+        client += "\tfor (const [name, params] of Object.entries(delta.meshes || {})) {\n"
+        client += "\t\tloader.load(params.url, (gltf) => {\n"
+        client += "\t\t\tconst old = scene.getObjectByName(name);\n"
+        client += "\t\t\tif (!old) {\n"
+        client += "\t\t\t\tconsole.warn(`Live link: ${name} is merged, instanced or LOD in this page, export again to see its new geometry`);\n"
+        client += "\t\t\t\treturn;\n"
+        client += "\t\t\t}\n"
+        client += "\t\t\t// The glTF node carries its exported transform, so it replaces the old node rather than its wrapper\n"
+        client += "\t\t\tconst node = gltf.scene.getObjectByName(params.node);\n"
+        client += "\t\t\tnode.name = name;\n"
+        client += "\t\t\tnode.position.copy(old.position);\n"
+        client += "\t\t\tnode.rotation.copy(old.rotation);\n"
+        client += "\t\t\told.parent.remove(old);\n"
+        client += "\t\t\tscene.add(node);\n"
+        client += "\t\t});\n"
+        client += "\t}\n"
+        if self.renders_on_demand(scene):
+            client += "\trequestRender();\n"
+        client += "}\n\n"
+        client += "function connectLiveLink() {\n"
+        client += f"\tconst socket = new WebSocket('ws://localhost:{scene.threejs_live_port}');\n"
+        client += "\tsocket.onmessage = (event) => applyLiveDelta(JSON.parse(event.data));\n"
+        client += "\t// Blender may not be serving yet, or the live link was restarted: keep trying quietly\n"
+        client += "\tsocket.onclose = () => setTimeout(connectLiveLink, 1000);\n"
+        client += "}\n"
+        client += "connectLiveLink();\n"
+        return client
+    
+    def export_threejs(self, html_path, export_dir):
+        for _ in self.export_steps(html_path, export_dir):
+            pass
         return True
+    
+    def export_steps(self, html_path, export_dir):
+        # Generator, one asset per step; closing it early keeps the previous script.js and the assets cached so far
+        scene = bpy.context.scene
+        html_dir = os.path.dirname(html_path)
+        
+        # Sections stream straight into script.js as they are generated; the temporary
+        # file only replaces the previous script.js once the whole program is written
+        js_path = os.path.join(html_dir, "script.js")
+        report_path = os.path.join(html_dir, EXPORT_REPORT)
+        self.profile = ExportProfile()
+        self.cache = ExportCache(os.path.join(html_dir, CACHE_MANIFEST), enabled=scene.threejs_use_cache)
+        self.failures = {}
+        self.symbols = SymbolTable(
+            bpy.data.objects,
+            names=[data.name for ids in (bpy.data.cameras, bpy.data.lights, bpy.data.meshes) for data in ids],
+            reserved=SCRIPT_GLOBALS,
+        )
+        self.animated = self.animated_objects() if scene.threejs_export_animation else set()
+        self.manifest = SceneManifest(os.path.join(html_dir, SCENE_MANIFEST)) if scene.threejs_scene_format == 'MANIFEST' else None
+        self.library = 'CDN'
+        if scene.threejs_library_source != 'CDN':
+            with self.profile.phase("vendor"):
+                self.library = self.vendor_library(scene, html_dir)
+        self.lightmaps = {}
+        self.lightmap_uvs = []
+        self.lights_baked = False
+        try:
+            if scene.threejs_bake_lightmaps:
+                with self.profile.phase("lightmaps"):
+                    for _ in self.bake_lightmaps(scene, html_dir):
+                        # Baking exports no meshes yet, so the modal progress stays put
+                        self.profile.charge()
+                        yield 0
+                        self.profile.resume()
+                meshes = [obj for obj in bpy.data.objects if obj.type == "MESH"]
+                self.lights_baked = bool(meshes) and all(obj.name in self.lightmaps for obj in meshes)
+            # Buffered writes that spill while generating count as codegen; file_writes is
+            # everything written once the code is complete
+            with self.profile.phase("codegen"):
+                with open(js_path + ".tmp", "w", buffering=JS_BUFFER_SIZE) as out:
+                    self.write_imports(out, scene)
+                    if scene.threejs_export_animation:
+                        with self.profile.phase("animation"):
+                            self.write_animation(out, scene, html_dir)
+                    with self.profile.phase("cameras"):
+                        self.write_cameras(out)
+                    with self.profile.phase("lights"):
+                        self.write_lights(out)
+                    for done in self.write_objects(out, scene, html_dir, export_dir):
+                        self.profile.charge()
+                        yield done
+                        self.profile.resume()
+                    self.write_renderer(out, scene, camera_used="camera" if self.manifest else None)
+                    if self.live:
+                        out.write(self.live_client(scene))
+                    with self.profile.phase("file_writes"):
+                        out.flush()
+            with self.profile.phase("file_writes"):
+                if self.manifest:
+                    self.manifest.close()
+        except BaseException as e:
+            if self.manifest:
+                self.manifest.discard()
+            if os.path.exists(js_path + ".tmp"):
+                os.remove(js_path + ".tmp")
+            self.cache.save(partial=True)
+            self.remove_lightmap_uvs()
+            # A partial report still shows which phase and which assets the time went into
+            self.profile.save(report_path, self.failures, error="cancelled" if isinstance(e, GeneratorExit) else repr(e))
+            raise
+        
+        self.remove_lightmap_uvs()
+        with self.profile.phase("file_writes"):
+            os.replace(js_path + ".tmp", js_path)
+        
+        page_js = js_path
+        if self.library == 'BUNDLED':
+            with self.profile.phase("bundle"):
+                page_js = self.bundle_script(scene, html_dir, js_path) or js_path
+        
+        with self.profile.phase("file_writes"):
+            # Generate and save the HTML file
+            self.generate_html(html_path, page_js)
+            
+            # three.js is kept for older pages that still import it, as a one-line re-export
+            three_js_path = os.path.join(html_dir, "three.js")
+            with open(three_js_path, "w") as file:
+                file.write(f'import "./{os.path.basename(page_js)}";\n')
+        
+        self.profile.save(report_path, self.failures)
+
+class THREEJS_OT_live_link(THREEJS_OT_export_scene):
+    # Exports once, then pushes what changes to open pages every threejs_live_interval until stopped
+    bl_idname = "threejs.live_link"
+    bl_label = "Three.js Live Link"
+    bl_description = "Export the scene, then keep open pages in sync over a local WebSocket until stopped"
+    live = True
+    
+    def execute(self, context):
+        return self.invoke(context, None)
+    
+    def invoke(self, context, event):
+        global live_link
+        if live_link:
+            # The same button stops a running live link
+            live_link.stop(context)
+            return {'FINISHED'}
+        
+        if self.export_running(context):
+            return {'CANCELLED'}
+        paths = self.export_paths(context)
+        if not paths:
+            return {'CANCELLED'}
+        try:
+            self.export_threejs(*paths)
+        except Exception as e:
+            return self.export_failed(context, e)
+        
+        scene = context.scene
+        try:
+            self.server = LiveServer(scene.threejs_live_port)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not serve the live link on port {scene.threejs_live_port}: {e}")
+            scene.threejs_export_status = f"ERROR: Could not serve the live link on port {scene.threejs_live_port}"
+            return {'CANCELLED'}
+        
+        self.html_dir = os.path.dirname(paths[0])
+        self.live_dir = os.path.join(paths[1], LIVE_DIR)
+        os.makedirs(self.live_dir, exist_ok=True)
+        self.settings = self.export_settings()
+        # The digests the page's meshes were exported with; geometry updates that leave them
+        # unchanged (entering edit mode, say) are not re-exported
+        self.digests = {obj.name: self.cache.digest([obj], self.settings) for obj in bpy.data.objects if obj.type == "MESH"}
+        self.versions = {}
+        self.moved = set()
+        self.retuned = set()
+        self.reshaped = {}
+        
+        self.handler = self.track_updates
+        bpy.app.handlers.depsgraph_update_post.append(self.handler)
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(scene.threejs_live_interval, window=context.window)
+        wm.modal_handler_add(self)
+        live_link = self
+        scene.threejs_export_status = f"Live link on ws://localhost:{scene.threejs_live_port} for {paths[0]}"
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if live_link is not self:
+            return {'FINISHED'}
+        if event.type == 'TIMER':
+            self.flush(context)
+        return {'PASS_THROUGH'}
+    
+    def cancel(self, context):
+        if live_link is self:
+            self.stop(context)
+    
+    def stop(self, context):
+        global live_link
+        live_link = None
+        context.window_manager.event_timer_remove(self.timer)
+        if self.handler in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(self.handler)
+        self.server.close()
+        context.scene.threejs_export_status = "Live link stopped"
+    
+    def track_updates(self, scene, depsgraph):
+        now = time.perf_counter()
+        for update in depsgraph.updates:
+            data = update.id.original
+            if isinstance(data, bpy.types.Object):
+                if update.is_updated_transform:
+                    self.moved.add(data.name)
+                if update.is_updated_geometry and data.type == "MESH":
+                    self.reshaped[data.name] = now
+            elif isinstance(data, (bpy.types.Light, bpy.types.Camera)):
+                self.retuned.add(data.name)
+            elif isinstance(data, bpy.types.Material):
+                for obj in bpy.data.objects:
+                    if obj.type == "MESH" and any(slot.material == data for slot in obj.material_slots):
+                        self.reshaped[obj.name] = now
+    
+    def flush(self, context):
+        # Sends everything noted since the last tick as one delta
+        delta = {"nodes": {}, "lights": {}, "cameras": {}, "meshes": {}}
+        for name in self.moved:
+            obj = bpy.data.objects.get(name)
+            if not obj:
+                continue
+            delta["nodes"][self.safe_name(obj.name)] = {
+                "position": self.safe_vector(obj.location),
+                "rotation": self.safe_vector(obj.rotation_euler),
+            }
+            if obj.type in {"LIGHT", "CAMERA"}:
+                # A spot light's target moves with it
+                self.retuned.add(obj.data.name)
+        
+        # Like write_lights and write_cameras, the page names lights and cameras after their data
+        for name in self.retuned:
+            obj = bpy.data.objects.get(name)
+            if obj and obj.type == "LIGHT":
+                params = self.light_params(obj.data, obj)
+                if params:
+                    delta["lights"][params["name"]] = params
+            elif obj and obj.type == "CAMERA":
+                delta["cameras"][self.safe_name(name)] = {"fov": obj.data.lens}
+        self.moved.clear()
+        self.retuned.clear()
+        
+        now = time.perf_counter()
+        for name, changed in list(self.reshaped.items()):
+            obj = bpy.data.objects.get(name)
+            # Edit mode changes only reach the mesh when the user leaves edit mode
+            if obj and (now - changed < LIVE_SETTLE or obj.mode == 'EDIT'):
+                continue
+            del self.reshaped[name]
+            if not obj:
+                continue
+            digest = self.cache.digest([obj], self.settings)
+            if digest == self.digests.get(name):
+                continue
+            url = self.export_live_mesh(context, obj)
+            if url:
+                self.digests[name] = digest
+                delta["meshes"][self.safe_name(obj.name)] = {"url": url, "node": self.gltf_node_name(obj.name)}
+        
+        delta = {section: entries for section, entries in delta.items() if entries}
+        if delta:
+            self.server.broadcast(delta)
+    
+    def export_live_mesh(self, context, obj):
+        # Every version gets its own file, so the browser never serves a stale one from its cache
+        version = self.versions.get(obj.name, 0) + 1
+        stem = os.path.join(self.live_dir, self.safe_name(obj.name))
+        export_path = f"{stem}_{version}{self.asset_ext()}"
+        selected = list(context.selected_objects)
+        active = context.view_layer.objects.active
+        try:
+            export_selection([obj], export_path, self.settings)
+        except Exception as e:
+            print(f"Warning: live link could not export '{obj.name}': {e}")
+            return None
+        finally:
+            # The exporter works on the selection; give the user theirs back
+            for other in selected:
+                other.select_set(True)
+            context.view_layer.objects.active = active
+        
+        previous = f"{stem}_{version - 1}{self.asset_ext()}"
+        if os.path.exists(previous):
+            os.remove(previous)
+        self.versions[obj.name] = version
+        return self.asset_url(export_path, self.html_dir)
 
 def register():
     bpy.types.Scene.threejs_html_path = StringProperty(
@@ -341,16 +2962,338 @@ def register():
         name="Export Status",
         default=""
     )
+    bpy.types.Scene.threejs_export_report = StringProperty(
+        name="Export Report",
+        description=f"Summary of the last export's {EXPORT_REPORT}",
+        default=""
+    )
+    bpy.types.Scene.threejs_report_top = IntProperty(
+        name="Report Top Assets",
+        description="How many of the slowest and largest assets the panel lists after an export",
+        default=5,
+        min=1,
+        max=50
+    )
+    bpy.types.Scene.threejs_scene_format = EnumProperty(
+        name="Scene Format",
+        description="How cameras, lights and objects are described in the generated page",
+        items=[
+            ('CODE', "JavaScript", "Unrolled three.js code for every camera, light and object"),
+            ('MANIFEST', "Manifest", "A compact scene.json read by a small fixed runtime loop"),
+        ],
+        default='CODE'
+    )
+    bpy.types.Scene.threejs_export_mode = EnumProperty(
+        name="Export Mode",
+        description="How meshes are handed to the glTF exporter",
+        items=[
+            ('PER_OBJECT', "Per Object", "Run the glTF exporter once for every mesh"),
+            ('BATCHED', "Batched", "Export meshes in a single exporter pass, or in chunks"),
+            ('PARALLEL', "Parallel", "Export meshes in background Blender worker processes"),
+        ],
+        default='PER_OBJECT'
+    )
+    bpy.types.Scene.threejs_batch_size = IntProperty(
+        name="Meshes per File",
+        description="Meshes per batched glTF file (0 exports every mesh in one file)",
+        default=0,
+        min=0
+    )
+    bpy.types.Scene.threejs_worker_count = IntProperty(
+        name="Workers",
+        description="Number of background Blender processes used by the parallel export mode",
+        default=os.cpu_count() or 1,
+        min=1
+    )
+    bpy.types.Scene.threejs_blender_path = StringProperty(
+        name="Blender Executable",
+        description="Executable started for parallel export workers (empty uses the running Blender)",
+        default="",
+        subtype='FILE_PATH'
+    )
+    bpy.types.Scene.threejs_use_instancing = BoolProperty(
+        name="Instance Shared Meshes",
+        description="Export each mesh shared by several objects once and draw it as a THREE.InstancedMesh",
+        default=False
+    )
+    bpy.types.Scene.threejs_static_batching = BoolProperty(
+        name="Static Batching",
+        description="Merge meshes without animation, drivers or constraints into one asset per material set and chunk",
+        default=False
+    )
+    bpy.types.Scene.threejs_static_chunk_size = FloatProperty(
+        name="Chunk Size",
+        description="Edge length of the grid static batches are split along, so frustum culling keeps working; 0 merges each material set into one asset",
+        default=25.0,
+        min=0.0
+    )
+    bpy.types.Scene.threejs_use_cache = BoolProperty(
+        name="Skip Unchanged Meshes",
+        description="Reuse exported assets whose mesh data, modifiers and materials have not changed since the last export",
+        default=True
+    )
+    bpy.types.Scene.threejs_export_format = EnumProperty(
+        name="Format",
+        description="File layout of the exported meshes",
+        items=[
+            ('GLB', "glTF Binary (.glb)", "A single binary file per asset"),
+            ('GLTF_SEPARATE', "glTF Separate (.gltf + .bin)", "JSON with a separate binary buffer per asset"),
+        ],
+        default='GLB'
+    )
+    bpy.types.Scene.threejs_use_draco = BoolProperty(
+        name="Draco Compression",
+        description="Compress mesh geometry with Draco and decode it in the browser with DRACOLoader",
+        default=False
+    )
+    bpy.types.Scene.threejs_draco_level = IntProperty(
+        name="Compression Level",
+        description="Draco compression level (higher is smaller but slower to encode)",
+        default=6,
+        min=0,
+        max=10
+    )
+    bpy.types.Scene.threejs_position_bits = IntProperty(
+        name="Position Quantization",
+        description="Quantization bits for vertex positions (0 disables quantization)",
+        default=14,
+        min=0,
+        max=30
+    )
+    bpy.types.Scene.threejs_normal_bits = IntProperty(
+        name="Normal Quantization",
+        description="Quantization bits for vertex normals (0 disables quantization)",
+        default=10,
+        min=0,
+        max=30
+    )
+    bpy.types.Scene.threejs_texcoord_bits = IntProperty(
+        name="UV Quantization",
+        description="Quantization bits for texture coordinates (0 disables quantization)",
+        default=12,
+        min=0,
+        max=30
+    )
+    bpy.types.Scene.threejs_log_asset_stats = BoolProperty(
+        name="Log Asset Stats",
+        description="Log each asset's payload size and decode time to the browser console",
+        default=False
+    )
+    bpy.types.Scene.threejs_build_bvh = BoolProperty(
+        name="BVH Sidecars",
+        description="Build a bounding volume hierarchy per exported mesh next to its asset, so raycasts in the page skip most triangles",
+        default=False
+    )
+    bpy.types.Scene.threejs_share_textures = BoolProperty(
+        name="Shared Texture Directory",
+        description="Export images once, deduplicated by content, into a shared textures folder instead of into every glTF",
+        default=False
+    )
+    bpy.types.Scene.threejs_texture_max_size = IntProperty(
+        name="Max Texture Size",
+        description="Largest texture width or height in pixels (0 keeps the source size)",
+        default=2048,
+        min=0
+    )
+    bpy.types.Scene.threejs_texture_pow2 = BoolProperty(
+        name="Power of Two",
+        description="Round texture sizes down to a power of two",
+        default=True
+    )
+    bpy.types.Scene.threejs_use_ktx2 = BoolProperty(
+        name="KTX2 / Basis",
+        description="Encode textures as KTX2 (Basis Universal) with toktx and decode them with KTX2Loader",
+        default=False
+    )
+    bpy.types.Scene.threejs_ktx2_tool = StringProperty(
+        name="toktx",
+        description="Path to the KTX-Software toktx executable",
+        default="toktx",
+        subtype='FILE_PATH'
+    )
+    bpy.types.Scene.threejs_use_lod = BoolProperty(
+        name="Generate LOD Chains",
+        description="Export decimated levels of heavy meshes and switch between them with THREE.LOD",
+        default=False
+    )
+    bpy.types.Scene.threejs_lod_ratios = StringProperty(
+        name="LOD Ratios",
+        description="Comma separated Decimate ratios, one exported level per ratio",
+        default="0.5, 0.25, 0.1"
+    )
+    bpy.types.Scene.threejs_lod_min_triangles = IntProperty(
+        name="Min Triangles",
+        description="Meshes with fewer triangles are exported without LOD levels",
+        default=2000,
+        min=0
+    )
+    bpy.types.Scene.threejs_lod_distance_scale = FloatProperty(
+        name="Distance Scale",
+        description="Base switching distance in bounding radii; a level with ratio r takes over at this distance divided by sqrt(r)",
+        default=10.0,
+        min=0.1
+    )
+    bpy.types.Scene.threejs_export_animation = BoolProperty(
+        name="Bake Object Animation",
+        description="Bake moving objects, cameras and lights into keyframe tracks played by one AnimationMixer",
+        default=False
+    )
+    bpy.types.Scene.threejs_animation_tolerance = FloatProperty(
+        name="Keyframe Tolerance",
+        description="Largest error allowed when dropping samples that linear interpolation reproduces; 0 only drops exactly linear ones",
+        default=0.001,
+        min=0.0,
+        precision=4
+    )
+    bpy.types.Scene.threejs_bake_lightmaps = BoolProperty(
+        name="Bake Lightmaps",
+        description="Bake lighting and shadows of static meshes into lightmap atlases with CPU Cycles; baked meshes are unlit in the page, and real-time lights are dropped when every mesh is baked",
+        default=False
+    )
+    bpy.types.Scene.threejs_lightmap_size = IntProperty(
+        name="Lightmap Atlas Size",
+        description="Width and height of each lightmap atlas in pixels",
+        default=1024,
+        min=64,
+        max=8192
+    )
+    bpy.types.Scene.threejs_lightmap_atlas_objects = IntProperty(
+        name="Objects per Atlas",
+        description="How many meshes share one lightmap atlas",
+        default=16,
+        min=1
+    )
+    bpy.types.Scene.threejs_lightmap_samples = IntProperty(
+        name="Lightmap Samples",
+        description="Cycles samples per lightmap texel",
+        default=64,
+        min=1
+    )
+    bpy.types.Scene.threejs_progressive_loading = BoolProperty(
+        name="Progressive Loading",
+        description="Load assets nearest to the camera first, a few at a time, with aggregate progress",
+        default=False
+    )
+    bpy.types.Scene.threejs_max_concurrent_loads = IntProperty(
+        name="Concurrent Requests",
+        description="Maximum number of assets the page downloads at the same time",
+        default=6,
+        min=1
+    )
+    bpy.types.Scene.threejs_live_port = IntProperty(
+        name="Live Link Port",
+        description="Local port the live link's WebSocket server listens on",
+        default=8765,
+        min=1024,
+        max=65535
+    )
+    bpy.types.Scene.threejs_live_interval = FloatProperty(
+        name="Live Link Interval",
+        description="Seconds between updates sent to the page; changes in between are merged into one",
+        default=0.1,
+        min=0.02,
+        max=2.0
+    )
+    bpy.types.Scene.threejs_library_source = EnumProperty(
+        name="three.js Source",
+        description="Where the page loads three.js and its addons from",
+        items=[
+            ('CDN', "CDN", f"Import three@{THREE_VERSION} and the addons from cdn.skypack.dev"),
+            ('VENDORED', "Vendored", "Copy three.js and the addons the page uses next to it, resolved with an import map"),
+            ('BUNDLED', "Bundled", "Vendor, then bundle the script and the modules it uses into one minified file with esbuild"),
+        ],
+        default='CDN'
+    )
+    bpy.types.Scene.threejs_three_path = StringProperty(
+        name="Local three.js Package",
+        description=f"three@{THREE_VERSION} package folder (e.g. node_modules/three) to vendor from; empty downloads the files from unpkg once",
+        default="",
+        subtype='DIR_PATH'
+    )
+    bpy.types.Scene.threejs_bundler = StringProperty(
+        name="esbuild",
+        description="Path to the esbuild executable",
+        default="esbuild",
+        subtype='FILE_PATH'
+    )
+    bpy.types.Scene.threejs_renderer_profile = EnumProperty(
+        name="Renderer Profile",
+        description="How the page trades battery and GPU time for image quality",
+        items=[
+            ('ON_DEMAND', "On Demand", "Draw only when the camera moves or something loads, no antialiasing or shadows, pixel ratio capped at 1"),
+            ('BALANCED', "Balanced", "Draw on demand with antialiasing, PCF shadows from opted-in lights and pixel ratio capped at 1.5"),
+            ('QUALITY', "Quality", "Draw every frame with antialiasing, soft shadows from opted-in lights and pixel ratio capped at 2"),
+        ],
+        default='BALANCED'
+    )
+    bpy.types.Light.threejs_cast_shadow = BoolProperty(
+        name="Cast Shadow in Three.js",
+        description="Let this light cast shadows in the exported page when the renderer profile draws shadows",
+        default=False
+    )
     
     bpy.utils.register_class(THREEJS_PT_export_panel)
     bpy.utils.register_class(THREEJS_OT_export_scene)
+    bpy.utils.register_class(THREEJS_OT_live_link)
 
 def unregister():
+    if live_link:
+        live_link.stop(bpy.context)
     bpy.utils.unregister_class(THREEJS_PT_export_panel)
     bpy.utils.unregister_class(THREEJS_OT_export_scene)
+    bpy.utils.unregister_class(THREEJS_OT_live_link)
     
     del bpy.types.Scene.threejs_html_path
     del bpy.types.Scene.threejs_export_status
+    del bpy.types.Scene.threejs_export_report
+    del bpy.types.Scene.threejs_report_top
+    del bpy.types.Scene.threejs_scene_format
+    del bpy.types.Scene.threejs_export_mode
+    del bpy.types.Scene.threejs_batch_size
+    del bpy.types.Scene.threejs_worker_count
+    del bpy.types.Scene.threejs_blender_path
+    del bpy.types.Scene.threejs_use_instancing
+    del bpy.types.Scene.threejs_static_batching
+    del bpy.types.Scene.threejs_static_chunk_size
+    del bpy.types.Scene.threejs_use_cache
+    del bpy.types.Scene.threejs_export_format
+    del bpy.types.Scene.threejs_use_draco
+    del bpy.types.Scene.threejs_draco_level
+    del bpy.types.Scene.threejs_position_bits
+    del bpy.types.Scene.threejs_normal_bits
+    del bpy.types.Scene.threejs_texcoord_bits
+    del bpy.types.Scene.threejs_log_asset_stats
+    del bpy.types.Scene.threejs_build_bvh
+    del bpy.types.Scene.threejs_share_textures
+    del bpy.types.Scene.threejs_texture_max_size
+    del bpy.types.Scene.threejs_texture_pow2
+    del bpy.types.Scene.threejs_use_ktx2
+    del bpy.types.Scene.threejs_ktx2_tool
+    del bpy.types.Scene.threejs_use_lod
+    del bpy.types.Scene.threejs_lod_ratios
+    del bpy.types.Scene.threejs_lod_min_triangles
+    del bpy.types.Scene.threejs_lod_distance_scale
+    del bpy.types.Scene.threejs_export_animation
+    del bpy.types.Scene.threejs_animation_tolerance
+    del bpy.types.Scene.threejs_bake_lightmaps
+    del bpy.types.Scene.threejs_lightmap_size
+    del bpy.types.Scene.threejs_lightmap_atlas_objects
+    del bpy.types.Scene.threejs_lightmap_samples
+    del bpy.types.Scene.threejs_progressive_loading
+    del bpy.types.Scene.threejs_max_concurrent_loads
+    del bpy.types.Scene.threejs_live_port
+    del bpy.types.Scene.threejs_live_interval
+    del bpy.types.Scene.threejs_library_source
+    del bpy.types.Scene.threejs_three_path
+    del bpy.types.Scene.threejs_bundler
+    del bpy.types.Scene.threejs_renderer_profile
+    del bpy.types.Light.threejs_cast_shadow
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if argv[:1] == [WORKER_FLAG]:
+        run_export_worker(argv[1])
+    elif argv[:1] == [EXPORT_FLAG]:
+        run_cli_export(argv[1])
+    else:
+        register()
\ No newline at end of file